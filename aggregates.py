@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Count aggregates computed while loading.
+
+Questions like "action items per assignee" or "meetings per documenter"
+(documenter_queries.sql #10) otherwise need a full SQL GROUP BY or an
+unbounded MeTTa match. With aggregates configured, the loaders count each
+row's values of the configured columns as they stream (row_to_atoms calls
+Aggregates.add_row), and summary atoms are added to the table's space:
+
+    (:count :action_items.assignee "Alice" 42)
+
+    load_all(interp, aggregates={"action_items": ["assignee", "status"],
+                                 "meetings": ["documenter", "workgroup"]})
+    aggregate_counts(interp, "meetings", "documenter", limit=10)
+    interp.run('!(match &self (:count :action_items.assignee "Alice" $n) $n)')
+
+Values other than strings, numbers and booleans (dates, timestamps,
+numeric, UUIDs, JSON) are counted by their text, as the summary atoms show
+them: aggregate_count(interp, "meetings", "date", "2024-01-02").
+
+Null values are not counted (as with WHERE col IS NOT NULL). Counts are
+kept up to date as records are added or removed (remove_record, the
+windowed loader's refresh); refresh_aggregate_atoms rewrites just the
+summary atoms whose count changed. Like space_state.py, this module needs
+no database access.
+"""
+
+from space_state import get_space_state, table_space
+
+AGGREGATE_HEAD = ":count"
+
+
+class Aggregates:
+    """
+    Counts {table: {column: {value: n}}} plus each record's counted values,
+    so a removed or reloaded record is taken back out of the counts.
+    """
+
+    def __init__(self, columns=None):
+        self.columns = {t: list(cols) for t, cols in (columns or {}).items()}
+        self.counts = {}
+        self._records = {}       # {table: {record_id: {column: value}}}
+        self._dirty = set()      # (table, column, value) changed since the last refresh
+        self._materialized = {}  # {(table, column, value): n} as present in the space
+
+    def add_row(self, table, record_id, row):
+        """Count the configured columns of one row (replacing a reloaded record's values)."""
+        columns = self.columns.get(table)
+        if not columns:
+            return
+        if record_id is not None:
+            self.remove(table, record_id)
+        values = {}
+        for col in columns:
+            val = row.get(col)
+            if val is not None:
+                # Other values (dates, numeric, UUIDs, JSON) are counted by their
+                # text, as encode_value writes them and as the manifest stores them
+                values[col] = val if isinstance(val, (str, int, float)) else str(val)
+        table_counts = self.counts.setdefault(table, {})
+        for col, val in values.items():
+            col_counts = table_counts.setdefault(col, {})
+            col_counts[val] = col_counts.get(val, 0) + 1
+            self._dirty.add((table, col, val))
+        if record_id is not None:
+            self._records.setdefault(table, {})[record_id] = values
+
+    def remove(self, table, record_id):
+        """Take a record's values back out of the counts (no-op if unknown)."""
+        values = self._records.get(table, {}).pop(record_id, None)
+        if not values:
+            return
+        table_counts = self.counts[table]
+        for col, val in values.items():
+            col_counts = table_counts[col]
+            col_counts[val] -= 1
+            if not col_counts[val]:
+                del col_counts[val]
+            self._dirty.add((table, col, val))
+
+    def get(self, table, column, value):
+        return self.counts.get(table, {}).get(column, {}).get(value, 0)
+
+    def top(self, table, column, limit=None):
+        """[(value, n), ...] by descending count."""
+        ranked = sorted(self.counts.get(table, {}).get(column, {}).items(),
+                        key=lambda kv: -kv[1])
+        return ranked if limit is None else ranked[:limit]
+
+    def to_json(self):
+        """Counts only, as {table: {column: [[value, n], ...]}}."""
+        return {
+            table: {col: list(col_counts.items()) for col, col_counts in cols.items()}
+            for table, cols in self.counts.items()
+        }
+
+    @classmethod
+    def from_json(cls, columns, data):
+        """
+        Restore counts written by to_json, whose summary atoms were loaded
+        from an export. Records are not restored, so removing a record
+        loaded this way does not update the counts.
+        """
+        aggregates = cls(columns)
+        for table, cols in data.items():
+            for col, pairs in cols.items():
+                aggregates.counts.setdefault(table, {})[col] = {val: n for val, n in pairs}
+                aggregates._materialized.update(((table, col, val), n) for val, n in pairs)
+        return aggregates
+
+    def summary_atoms(self, table):
+        """MeTTa text of a table's (:count ...) atoms, marked as present in the space."""
+        atoms = []
+        for col, col_counts in self.counts.get(table, {}).items():
+            for val, n in col_counts.items():
+                atoms.append(f"{_summary_prefix(table, col, val)} {n})")
+                self._materialized[(table, col, val)] = n
+                self._dirty.discard((table, col, val))
+        return atoms
+
+
+def _summary_prefix(table, col, val):
+    # Imported here: connect.py imports this module
+    from connect import column_symbol, encode_value
+    return f"({AGGREGATE_HEAD} {column_symbol(table, col)} {encode_value(val)}"
+
+
+# -------------------------------------------------------------
+# PER-INTERPRETER AGGREGATES
+# -------------------------------------------------------------
+def set_aggregates(interp, columns):
+    """
+    Count values of these columns in the rows loaded from now on.
+
+    Args:
+        interp: MeTTa interpreter (set before loading)
+        columns: {table: [column, ...]}
+    """
+    state = get_space_state(interp)
+    aggregates = state.get("aggregates")
+    if aggregates is None:
+        aggregates = state["aggregates"] = Aggregates()
+    for table, cols in columns.items():
+        known = aggregates.columns.setdefault(table, [])
+        known.extend(c for c in cols if c not in known)
+    return aggregates
+
+
+def get_aggregates(interp):
+    """The interpreter's Aggregates, or None if none were configured or loaded."""
+    return get_space_state(interp).get("aggregates")
+
+
+def _aggregates_or_raise(interp):
+    aggregates = get_aggregates(interp)
+    if aggregates is None:
+        raise ValueError("No aggregates: load with aggregates={table: [columns]} first")
+    return aggregates
+
+
+def aggregate_count(interp, table, column, value):
+    """Number of loaded records of `table` whose `column` equals `value`."""
+    return _aggregates_or_raise(interp).get(table, column, value)
+
+
+def aggregate_counts(interp, table, column, limit=None):
+    """[(value, n), ...] for a column, most frequent first."""
+    return _aggregates_or_raise(interp).top(table, column, limit)
+
+
+def refresh_aggregate_atoms(interp):
+    """
+    Bring the (:count ...) summary atoms in line with the counts: atoms of
+    values whose count changed since the last refresh are replaced.
+
+    Returns:
+        Number of summary atoms rewritten
+    """
+    aggregates = get_aggregates(interp)
+    if aggregates is None or not aggregates._dirty:
+        return 0
+
+    materialized = aggregates._materialized
+    rewritten = 0
+    for key in aggregates._dirty:
+        table, col, val = key
+        _, space = table_space(interp, table)
+        prefix = _summary_prefix(table, col, val)
+        old = materialized.pop(key, None)
+        if old is not None:
+            space.remove_atom(interp.parse_single(f"{prefix} {old})"))
+        n = aggregates.get(table, col, val)
+        if n:
+            space.add_atom(interp.parse_single(f"{prefix} {n})"))
+            materialized[key] = n
+        rewritten += 1
+    aggregates._dirty.clear()
+    return rewritten
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Asyncio variants of the SQL and query helpers in connect.py.
+
+SQL goes through an asyncpg connection pool, so concurrent requests overlap
+their database round trips instead of blocking the event loop on
+psycopg2. MeTTa calls (which are blocking and not thread-safe) run on a
+bounded executor: by default a single worker thread per process, with a
+semaphore limiting how many calls may queue for it.
+
+asyncpg is optional (pip install asyncpg); everything else in this
+repository works without it.
+
+Usage:
+    from async_connect import open_pool, close_pool, query_hybrid
+
+    await open_pool()
+    results = await query_hybrid(interp, "action_items", "status = $1", ("active",),
+                                 ["text", "assignee"], limit=100)
+    await close_pool()
+
+Note that asyncpg uses $1, $2, ... placeholders rather than %s.
+"""
+
+import asyncio
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+try:
+    import asyncpg
+except ImportError:  # optional dependency
+    asyncpg = None
+
+# Importing connect does not open its psycopg2 connection (see get_connection)
+import connect
+
+# hyperon interpreters are not thread-safe: keep one worker unless every
+# caller uses its own interpreter
+METTA_WORKERS = 1
+# Maximum interpreter calls queued on the executor at once
+METTA_QUEUE_LIMIT = 64
+
+_pool = None
+_executor = None
+_metta_slots = None
+
+
+# -------------------------------------------------------------
+# POOL + EXECUTOR
+# -------------------------------------------------------------
+async def _init_connection(con):
+    # Decode json/jsonb like psycopg2 does, so row_to_atoms sees the same values
+    for type_name in ("json", "jsonb"):
+        await con.set_type_codec(type_name, encoder=json.dumps, decoder=json.loads,
+                                 schema="pg_catalog")
+
+
+async def open_pool(min_size=1, max_size=10, metta_workers=METTA_WORKERS,
+                    metta_queue_limit=METTA_QUEUE_LIMIT):
+    """
+    Create the asyncpg pool (from DATABASE_URL / DB_PASSWORD) and the
+    interpreter executor. Safe to call more than once.
+
+    Args:
+        min_size: Minimum pool connections
+        max_size: Maximum pool connections (concurrent SQL statements)
+        metta_workers: Threads running interpreter calls
+        metta_queue_limit: Interpreter calls allowed to wait at once
+
+    Returns:
+        The asyncpg pool
+    """
+    global _pool, _executor, _metta_slots
+    if asyncpg is None:
+        raise ImportError("async_connect requires asyncpg (pip install asyncpg)")
+    if _pool is None:
+        url = urlparse(connect.DATABASE_URL)
+        _pool = await asyncpg.create_pool(
+            database=url.path[1:],
+            user=url.username,
+            password=connect.DB_PASSWORD,
+            host=url.hostname,
+            port=url.port,
+            min_size=min_size,
+            max_size=max_size,
+            init=_init_connection,
+        )
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=metta_workers,
+                                       thread_name_prefix="metta")
+        _metta_slots = asyncio.Semaphore(metta_queue_limit)
+    return _pool
+
+
+async def close_pool():
+    """Close the pool and shut down the interpreter executor."""
+    global _pool, _executor, _metta_slots
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+        _metta_slots = None
+
+
+def _get_pool():
+    if _pool is None:
+        raise RuntimeError("No connection pool: await open_pool() first")
+    return _pool
+
+
+async def run_metta(fn, *args):
+    """
+    Run a blocking interpreter call fn(*args) on the bounded executor.
+
+    Waits (without blocking the event loop) while METTA_QUEUE_LIMIT calls
+    are already queued.
+    """
+    if _executor is None or _metta_slots is None:
+        raise RuntimeError("No interpreter executor: await open_pool() first")
+    async with _metta_slots:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, lambda: fn(*args))
+
+
+def _row_dict(record):
+    # psycopg2 returns UUIDs as strings; keep IDs interchangeable with connect.py
+    return {k: str(v) if isinstance(v, uuid.UUID) else v for k, v in record.items()}
+
+
+# -------------------------------------------------------------
+# SCHEMA FUNCTIONS
+# -------------------------------------------------------------
+async def get_tables():
+    rows = await _get_pool().fetch("""
+        SELECT table_name
+        FROM information_schema.tables
+        WHERE table_schema = 'public'
+        ORDER BY table_name;
+    """)
+    return [row[0] for row in rows]
+
+
+async def get_columns(table):
+    rows = await _get_pool().fetch("""
+        SELECT column_name, data_type, is_nullable
+        FROM information_schema.columns
+        WHERE table_schema='public'
+          AND table_name=$1
+        ORDER BY ordinal_position;
+    """, table)
+    return [tuple(row) for row in rows]
+
+
+async def get_foreign_keys(table):
+    rows = await _get_pool().fetch("""
+    SELECT
+        kcu.column_name,
+        ccu.table_name AS foreign_table,
+        ccu.column_name AS foreign_column
+    FROM
+        information_schema.table_constraints AS tc
+        JOIN information_schema.key_column_usage AS kcu
+            ON tc.constraint_name = kcu.constraint_name
+        JOIN information_schema.constraint_column_usage AS ccu
+            ON ccu.constraint_name = tc.constraint_name
+    WHERE tc.constraint_type = 'FOREIGN KEY'
+      AND tc.table_name = $1;
+    """, table)
+    return [tuple(row) for row in rows]
+
+
+async def get_full_schema():
+    """Schema of every table; per-table lookups run concurrently on the pool."""
+    tables = await get_tables()
+    columns = await asyncio.gather(*(get_columns(t) for t in tables))
+    foreign_keys = await asyncio.gather(*(get_foreign_keys(t) for t in tables))
+    return {
+        t: {"columns": c, "foreign_keys": fk}
+        for t, c, fk in zip(tables, columns, foreign_keys)
+    }
+
+
+# -------------------------------------------------------------
+# DATA FETCH
+# -------------------------------------------------------------
+async def fetch_table(table):
+    rows = await _get_pool().fetch(f"SELECT * FROM {table}")
+    return [_row_dict(row) for row in rows]
+
+
+async def iter_table(table, chunk_size=5000):
+    """
+    Stream rows of a table as dicts (async generator).
+
+    Uses a server-side cursor, so only `chunk_size` rows are transferred
+    from Postgres at a time. Holds one pool connection until exhausted.
+    """
+    async with _get_pool().acquire() as con:
+        async with con.transaction():
+            async for row in con.cursor(f"SELECT * FROM {table}", prefetch=chunk_size):
+                yield _row_dict(row)
+
+
+async def fetch_ids(table, where=None, params=(), limit=100):
+    """
+    SELECT id ... [WHERE where] ORDER BY id LIMIT n.
+
+    Args:
+        table: Table name
+        where: Optional condition with asyncpg placeholders, e.g. "status = $1"
+        params: Parameters for `where`
+        limit: Maximum number of IDs
+
+    Returns:
+        List of IDs
+    """
+    sql = f"SELECT id FROM {table}"
+    if where:
+        sql += f" WHERE {where}"
+    sql += f" ORDER BY id LIMIT ${len(params) + 1}"
+    rows = await _get_pool().fetch(sql, *params, limit)
+    return [str(r[0]) if isinstance(r[0], uuid.UUID) else r[0] for r in rows]
+
+
+# -------------------------------------------------------------
+# PRODUCTION QUERY HELPERS
+# -------------------------------------------------------------
+async def query_by_id(interp, table, record_id, properties=None):
+    """Async connect.query_by_id (runs on the interpreter executor)."""
+    return await run_metta(connect.query_by_id, interp, table, record_id, properties)
+
+
+async def query_batch(interp, table, record_ids, properties=None, batch_size=50):
+    """
+    Async connect.query_batch.
+
+    Each batch is one executor call, so other requests get a turn between
+    batches instead of waiting for the whole ID list.
+    """
+    results = []
+    for i in range(0, len(record_ids), batch_size):
+        batch = record_ids[i:i + batch_size]
+        results.extend(await run_metta(connect.query_batch, interp, table, batch,
+                                       properties, batch_size))
+    return results
+
+
+async def query_hybrid(interp, table, where=None, params=(), properties=None,
+                       limit=100, batch_size=50):
+    """
+    The recommended hybrid pattern, async: SQL selects the IDs, MeTTa
+    answers for them.
+
+    Args:
+        interp: MeTTa interpreter
+        table: Table name
+        where: Optional condition with asyncpg placeholders, e.g. "status = $1"
+        params: Parameters for `where`
+        properties: Optional list of property names
+        limit: Maximum number of IDs selected by SQL
+        batch_size: Records per interpreter call
+
+    Returns:
+        List of result dicts
+    """
+    ids = await fetch_ids(table, where, params, limit)
+    return await query_batch(interp, table, ids, properties, batch_size)
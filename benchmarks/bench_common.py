@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the benchmark scripts: timing, percentiles and JSON results.
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    k = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[k]
+
+
+def summarize(latencies_s, items=None, total_s=None):
+    """
+    Summarize per-operation latencies (seconds).
+
+    Args:
+        latencies_s: List of per-operation durations in seconds
+        items: Number of items processed (default: one per operation)
+        total_s: Wall time of the whole run (default: sum of latencies)
+
+    Returns:
+        dict with count, items, total_s, items_per_s and p50/p90/p99/max in ms
+    """
+    lat = sorted(latencies_s)
+    total = total_s if total_s is not None else sum(lat)
+    items = items if items is not None else len(lat)
+    ms = lambda v: None if v is None else v * 1000
+    return {
+        "count": len(lat),
+        "items": items,
+        "total_s": total,
+        "items_per_s": items / total if total > 0 else None,
+        "p50_ms": ms(percentile(lat, 50)),
+        "p90_ms": ms(percentile(lat, 90)),
+        "p99_ms": ms(percentile(lat, 99)),
+        "max_ms": ms(lat[-1] if lat else None),
+    }
+
+
+def time_each(fn, args_list):
+    """Call fn(*args) for each args tuple; return (latencies_s, results)."""
+    latencies = []
+    results = []
+    for args in args_list:
+        start = time.perf_counter()
+        results.append(fn(*args))
+        latencies.append(time.perf_counter() - start)
+    return latencies, results
+
+
+def run_metadata(**extra):
+    """Environment details stored with every result file."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    meta = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "git_commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+    }
+    meta.update(extra)
+    return meta
+
+
+def write_results(path, meta, results):
+    """Write a result file: {"meta": {...}, "results": {name: summary}}."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2)
+
+
+def print_results(results):
+    """Print a summary table of benchmark results."""
+    print(f"{'benchmark':32s} {'items/s':>12s} {'p50 ms':>9s} {'p90 ms':>9s} {'p99 ms':>9s}")
+    fmt = lambda v, spec: format(v, spec) if v is not None else "-"
+    for name, r in results.items():
+        print(f"{name:32s} {fmt(r['items_per_s'], '12.1f'):>12s} {fmt(r['p50_ms'], '9.2f'):>9s} "
+              f"{fmt(r['p90_ms'], '9.2f'):>9s} {fmt(r['p99_ms'], '9.2f'):>9s}")
+
+
+def compare_results(baseline_path, results, threshold=0.10):
+    """
+    Compare results with a previous result file.
+
+    Flags a regression when throughput drops or p90 latency rises by more
+    than `threshold` (default 10%). Returns the list of regressed names.
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+
+    regressions = []
+    print(f"\nComparison with {baseline_path} (threshold {threshold:.0%}):")
+    for name, r in results.items():
+        b = baseline.get(name)
+        if not b:
+            print(f"  {name:32s} new")
+            continue
+        notes = []
+        if b.get("items_per_s") and r.get("items_per_s"):
+            change = r["items_per_s"] / b["items_per_s"] - 1
+            notes.append(f"throughput {change:+.1%}")
+            if change < -threshold:
+                regressions.append(name)
+        if b.get("p90_ms") and r.get("p90_ms"):
+            change = r["p90_ms"] / b["p90_ms"] - 1
+            notes.append(f"p90 {change:+.1%}")
+            if change > threshold and name not in regressions:
+                regressions.append(name)
+        flag = "  ⚠️ REGRESSION" if name in regressions else ""
+        print(f"  {name:32s} {', '.join(notes)}{flag}")
+    return regressions
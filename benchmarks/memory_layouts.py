@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark: bytes per row for each atom layout.
+
+Loads the same sample of rows into a fresh MeTTa space once per layout
+("property", "compact", "row") and reports:
+  - space bytes/row:  resident memory growth of the process while loading
+  - text bytes/row:   size of the generated atom text
+  - map bytes/row:    Python-side surrogate ID mapping (compact layouts)
+  - est bytes/row:    the loader's own estimate (space_state accounting),
+                      to calibrate ATOM_OVERHEAD_BYTES against the measurement
+
+Each layout runs in its own subprocess so freed memory from one layout
+cannot hide the cost of the next.
+
+Usage:
+    python benchmarks/memory_layouts.py [--table action_items] [--rows 5000]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def rss_bytes():
+    """Current resident set size of this process, in bytes."""
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def mapping_bytes(state):
+    """Rough size of the Python-side surrogate ID mapping."""
+    total = 0
+    for table, ids in state["ids"].items():
+        total += sys.getsizeof(ids) + sys.getsizeof(state["record_ids"][table])
+        total += sum(sys.getsizeof(rid) for rid in state["record_ids"][table])
+    return total
+
+
+def measure(table, rows, layout):
+    """Load `rows` rows of `table` with `layout` and return the measurements."""
+    from itertools import islice
+    from hyperon import MeTTa
+    from connect import iter_table, row_to_atoms, set_layout, record_row
+
+    sample = list(islice(iter_table(table), rows))
+    interp = MeTTa()
+    state = set_layout(interp, layout)
+
+    before = rss_bytes()
+    text_bytes = 0
+    atoms = 0
+    for row in sample:
+        row_atoms = row_to_atoms(table, row, layout, state)
+        for atom_str in row_atoms:
+            interp.run(f"!(add-atom &self {atom_str})")
+            text_bytes += len(atom_str)
+            atoms += 1
+        record_row(state, table, row_atoms)
+    after = rss_bytes()
+
+    n = max(len(sample), 1)
+    return {
+        "layout": layout,
+        "rows": len(sample),
+        "atoms": atoms,
+        "space_bytes_per_row": (after - before) / n,
+        "text_bytes_per_row": text_bytes / n,
+        "map_bytes_per_row": mapping_bytes(state) / n,
+        "est_bytes_per_row": state["stats"].get(table, {}).get("bytes", 0) / n,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes per row for each atom layout")
+    parser.add_argument("--table", default="action_items")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--layout", help=argparse.SUPPRESS)  # used by the subprocesses
+    args = parser.parse_args()
+
+    if args.layout:
+        print(json.dumps(measure(args.table, args.rows, args.layout)))
+        return
+
+    print("=" * 60)
+    print(f"Memory per row: {args.table} ({args.rows} rows)")
+    print("=" * 60)
+    print(f"{'layout':10s} {'atoms/row':>10s} {'space B/row':>12s} {'text B/row':>11s} {'map B/row':>10s} {'est B/row':>10s}")
+
+    for layout in ("property", "compact", "row"):
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--table", args.table,
+             "--rows", str(args.rows), "--layout", layout],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        r = json.loads(out.strip().splitlines()[-1])
+        atoms_per_row = r["atoms"] / max(r["rows"], 1)
+        print(f"{layout:10s} {atoms_per_row:10.1f} {r['space_bytes_per_row']:12.0f} "
+              f"{r['text_bytes_per_row']:11.0f} {r['map_bytes_per_row']:10.0f} "
+              f"{r['est_bytes_per_row']:10.0f}")
+
+
+if __name__ == "__main__":
+    main()
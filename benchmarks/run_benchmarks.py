@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the loader and query helpers in connect.py.
+
+Measures throughput and latency percentiles (p50/p90/p99) of:
+  fetch_table, row_to_atoms, load_all, query_by_id, query_batch and
+  query_by_property_value, plus a single property lookup run as a prepared
+  query (lookup_prepared) and as program text through interp.run (lookup_text)
+
+and writes the results as JSON so runs can be compared for regressions.
+
+Run it against a database filled by synthetic_archive.py. connect.py reads
+DATABASE_URL / DB_PASSWORD; --dsn sets both for this process.
+
+Usage:
+    python benchmarks/run_benchmarks.py --dsn postgresql://bench:pw@localhost/archive_bench \\
+        --output results.json [--compare baseline.json] [--queries 200]
+"""
+
+import argparse
+import os
+import sys
+import time
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_common import (
+    compare_results,
+    print_results,
+    run_metadata,
+    summarize,
+    time_each,
+    write_results,
+)
+
+
+def sample_column(cursor, table, column, n, seed=0.42):
+    """Deterministic random sample of non-null values of a column."""
+    cursor.execute("SELECT setseed(%s)", (seed,))
+    cursor.execute(f"SELECT {column} FROM {table} WHERE {column} IS NOT NULL "
+                   f"ORDER BY random() LIMIT %s", (n,))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def run(table, n_queries, batch_size, property_name):
+    from hyperon import MeTTa
+    from connect import (
+        column_symbol,
+        cursor,
+        encode_value,
+        fetch_table,
+        get_space_stats,
+        get_tables,
+        load_all,
+        prepare_query,
+        query_batch,
+        query_by_id,
+        query_by_property_value,
+        row_to_atoms,
+    )
+
+    results = {}
+    tables = get_tables()
+
+    # fetch_table: one operation per table, items = rows
+    print("Benchmarking fetch_table...")
+    latencies, fetched = time_each(fetch_table, [(t,) for t in tables])
+    results["fetch_table"] = summarize(latencies, items=sum(len(r) for r in fetched))
+    rows_by_table = dict(zip(tables, fetched))
+
+    # row_to_atoms: one operation per row, items = atoms
+    print("Benchmarking row_to_atoms...")
+    latencies = []
+    atoms = 0
+    for t, rows in rows_by_table.items():
+        for row in rows:
+            start = time.perf_counter()
+            atoms += len(row_to_atoms(t, row))
+            latencies.append(time.perf_counter() - start)
+    results["row_to_atoms"] = summarize(latencies, items=atoms)
+    del rows_by_table, fetched
+
+    # load_all: a single operation, items = atoms loaded
+    print("Benchmarking load_all...")
+    interp = MeTTa()
+    start = time.perf_counter()
+    load_all(interp)
+    elapsed = time.perf_counter() - start
+    results["load_all"] = summarize([elapsed], items=get_space_stats(interp)["atoms"])
+
+    ids = sample_column(cursor, table, "id", n_queries)
+    properties = ["text", "assignee", "status"]
+
+    print(f"Benchmarking query_by_id ({len(ids)} IDs)...")
+    latencies, _ = time_each(query_by_id, [(interp, table, i, properties) for i in ids])
+    results["query_by_id"] = summarize(latencies)
+
+    print(f"Benchmarking query_batch (batch size {batch_size})...")
+    batches = [ids[i:i + batch_size] for i in range(0, len(ids), batch_size)]
+    latencies, _ = time_each(query_batch,
+                             [(interp, table, b, properties, batch_size) for b in batches])
+    results["query_batch"] = summarize(latencies, items=len(ids))
+
+    # The same lookup, parsed once vs. tokenized and parsed on every call
+    print(f"Benchmarking prepared vs. text lookups ({len(ids)} IDs)...")
+    lookup = prepare_query(interp, "({head} {id} $val)")
+    lookup_args = [{"head": column_symbol(table, property_name), "id": encode_value(i)}
+                   for i in ids]
+    latencies, _ = time_each(lookup.run, [(interp, a) for a in lookup_args])
+    results["lookup_prepared"] = summarize(latencies)
+    latencies, _ = time_each(interp.run, [(lookup.format(a),) for a in lookup_args])
+    results["lookup_text"] = summarize(latencies)
+
+    values = sample_column(cursor, table, property_name, max(1, n_queries // 10))
+    print(f"Benchmarking query_by_property_value ({len(values)} values of {property_name})...")
+    latencies, found = time_each(query_by_property_value,
+                                 [(interp, table, property_name, v) for v in values])
+    results["query_by_property_value"] = summarize(latencies)
+    results["query_by_property_value"]["matches"] = sum(len(f) for f in found)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the loader and query helpers")
+    parser.add_argument("--dsn", help="Benchmark database (sets DATABASE_URL and DB_PASSWORD)")
+    parser.add_argument("--table", default="action_items", help="Table used for the query benchmarks")
+    parser.add_argument("--property", default="assignee", help="Column for query_by_property_value")
+    parser.add_argument("--queries", type=int, default=200, help="Number of IDs to query")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="Previous result file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative change counted as a regression (default 0.10)")
+    args = parser.parse_args()
+
+    if args.dsn:
+        os.environ["DATABASE_URL"] = args.dsn
+        os.environ["DB_PASSWORD"] = urlparse(args.dsn).password or os.getenv("DB_PASSWORD", "")
+
+    print("=" * 60)
+    print("archive-MeTTa Benchmarks")
+    print("=" * 60)
+    results = run(args.table, args.queries, args.batch_size, args.property)
+
+    print()
+    print_results(results)
+    meta = run_metadata(table=args.table, queries=args.queries, batch_size=args.batch_size)
+    write_results(args.output, meta, results)
+    print(f"\n✓ Results written to {args.output}")
+
+    if args.compare:
+        regressions = compare_results(args.compare, results, args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
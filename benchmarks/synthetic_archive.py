@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic archive dataset in a local Postgres database.
+
+Creates tables shaped like the meeting archive (workgroups, documenters,
+meetings, agenda_items, action_items) and fills them with deterministic
+random data at a configurable scale, using COPY for speed.
+
+Uses its own connection (--dsn or BENCH_DATABASE_URL) rather than
+connect.py: it creates and drops tables, so it must never point at the
+production database.
+
+Usage:
+    python benchmarks/synthetic_archive.py --dsn postgresql://localhost/archive_bench --scale small
+    python benchmarks/synthetic_archive.py --meetings 200000 --drop
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+import psycopg2
+
+# Meetings per scale; every other table is sized relative to meetings
+SCALES = {
+    "tiny": 200,
+    "small": 2000,
+    "medium": 20000,
+    "large": 200000,
+}
+
+SCHEMA = """
+CREATE TABLE workgroups (
+    id UUID PRIMARY KEY,
+    name TEXT NOT NULL,
+    type TEXT,
+    created_at TIMESTAMPTZ
+);
+CREATE TABLE documenters (
+    id UUID PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT,
+    created_at TIMESTAMPTZ
+);
+CREATE TABLE meetings (
+    id UUID PRIMARY KEY,
+    workgroup_id UUID REFERENCES workgroups(id),
+    date DATE,
+    type TEXT,
+    host TEXT,
+    documenter TEXT,
+    documenter_id UUID REFERENCES documenters(id),
+    title TEXT,
+    purpose TEXT,
+    notes TEXT,
+    created_at TIMESTAMPTZ
+);
+CREATE TABLE agenda_items (
+    id UUID PRIMARY KEY,
+    meeting_id UUID REFERENCES meetings(id),
+    status TEXT,
+    narrative TEXT,
+    created_at TIMESTAMPTZ
+);
+CREATE TABLE action_items (
+    id UUID PRIMARY KEY,
+    agenda_item_id UUID REFERENCES agenda_items(id),
+    text TEXT,
+    assignee TEXT,
+    due_date DATE,
+    status TEXT,
+    raw_json JSONB,
+    created_at TIMESTAMPTZ
+);
+"""
+
+TABLES = ["action_items", "agenda_items", "meetings", "documenters", "workgroups"]
+
+WORDS = ("review budget proposal schedule sprint documentation update client project "
+         "meeting funding research governance treasury community onboarding design "
+         "report milestone deliverable outreach proposal analysis roadmap").split()
+STATUSES = ["active", "done", "todo", "blocked", "cancelled"]
+MEETING_TYPES = ["Weekly", "Biweekly", "Monthly", "Custom"]
+
+
+class _Gen:
+    """Deterministic value generator (seeded)."""
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.start = date(2021, 1, 1)
+
+    def uuid(self):
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def sentence(self, min_words, max_words):
+        n = self.rng.randint(min_words, max_words)
+        return " ".join(self.rng.choice(WORDS) for _ in range(n)).capitalize()
+
+    def day(self, span_days=1500):
+        return self.start + timedelta(days=self.rng.randint(0, span_days))
+
+    def timestamp(self):
+        return datetime.combine(self.day(), datetime.min.time()) + timedelta(
+            seconds=self.rng.randint(0, 86399))
+
+
+def _copy(cur, table, columns, rows):
+    """COPY rows (tuples) into a table via an in-memory TSV buffer."""
+    buf = io.StringIO()
+    for row in rows:
+        buf.write("\t".join("\\N" if v is None else str(v).replace("\t", " ").replace("\n", " ")
+                            for v in row))
+        buf.write("\n")
+    buf.seek(0)
+    cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buf)
+
+
+def generate(dsn, meetings, seed=42, drop=False, nulls=0.2):
+    """
+    Create the schema and generate data.
+
+    Args:
+        dsn: Postgres connection string of the benchmark database
+        meetings: Number of meetings; other tables scale from it
+        seed: Random seed (same seed -> same dataset)
+        drop: Drop existing benchmark tables first
+        nulls: Fraction of nullable columns left NULL
+
+    Returns:
+        dict: table -> row count
+    """
+    g = _Gen(seed)
+    counts = {
+        "workgroups": max(5, meetings // 50),
+        "documenters": max(3, meetings // 100),
+        "meetings": meetings,
+        "agenda_items": meetings * 3,
+        "action_items": meetings * 3,
+    }
+    maybe = lambda v: None if g.rng.random() < nulls else v
+
+    conn = psycopg2.connect(dsn)
+    cur = conn.cursor()
+    if drop:
+        cur.execute(f"DROP TABLE IF EXISTS {', '.join(TABLES)} CASCADE")
+    cur.execute(SCHEMA)
+
+    people = [g.sentence(1, 1) + str(i) for i in range(max(20, meetings // 20))]
+
+    start = time.perf_counter()
+    workgroups = [g.uuid() for _ in range(counts["workgroups"])]
+    _copy(cur, "workgroups", ["id", "name", "type", "created_at"],
+          ((wid, f"Workgroup {i} " + g.sentence(1, 3), g.rng.choice(["Guild", "Circle", None]),
+            g.timestamp()) for i, wid in enumerate(workgroups)))
+
+    documenters = [g.uuid() for _ in range(counts["documenters"])]
+    documenter_names = {}
+    rows = []
+    for did in documenters:
+        name = g.rng.choice(people)
+        documenter_names[did] = name
+        rows.append((did, name, maybe(f"{name.lower()}@example.org"), g.timestamp()))
+    _copy(cur, "documenters", ["id", "name", "email", "created_at"], rows)
+
+    meeting_ids = []
+    rows = []
+    for _ in range(meetings):
+        mid = g.uuid()
+        meeting_ids.append(mid)
+        did = g.rng.choice(documenters)
+        rows.append((mid, g.rng.choice(workgroups), g.day(), g.rng.choice(MEETING_TYPES),
+                     g.rng.choice(people), documenter_names[did], did, g.sentence(2, 6),
+                     maybe(g.sentence(5, 20)), maybe(g.sentence(40, 400)), g.timestamp()))
+    _copy(cur, "meetings", ["id", "workgroup_id", "date", "type", "host", "documenter",
+                            "documenter_id", "title", "purpose", "notes", "created_at"], rows)
+
+    agenda_ids = []
+    rows = []
+    for _ in range(counts["agenda_items"]):
+        aid = g.uuid()
+        agenda_ids.append(aid)
+        rows.append((aid, g.rng.choice(meeting_ids), g.rng.choice(STATUSES),
+                     maybe(g.sentence(10, 80)), g.timestamp()))
+    _copy(cur, "agenda_items", ["id", "meeting_id", "status", "narrative", "created_at"], rows)
+
+    rows = []
+    for _ in range(counts["action_items"]):
+        text = g.sentence(4, 25)
+        assignee = maybe(g.rng.choice(people))
+        status = g.rng.choice(STATUSES)
+        raw = json.dumps({"text": text, "assignee": assignee, "status": status})
+        rows.append((g.uuid(), g.rng.choice(agenda_ids), text, assignee,
+                     maybe(g.day()), status, raw, g.timestamp()))
+    _copy(cur, "action_items", ["id", "agenda_item_id", "text", "assignee", "due_date",
+                                "status", "raw_json", "created_at"], rows)
+
+    cur.execute(f"ANALYZE {', '.join(TABLES)}")
+    conn.commit()
+    conn.close()
+
+    print(f"Generated {sum(counts.values())} rows in {time.perf_counter() - start:.1f}s:")
+    for table, n in counts.items():
+        print(f"  {table:15s} {n}")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic archive dataset")
+    parser.add_argument("--dsn", default=os.getenv("BENCH_DATABASE_URL"),
+                        help="Benchmark database (default: $BENCH_DATABASE_URL)")
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--meetings", type=int, help="Override the number of meetings")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--drop", action="store_true", help="Drop existing benchmark tables first")
+    args = parser.parse_args()
+
+    if not args.dsn:
+        parser.error("--dsn or BENCH_DATABASE_URL is required")
+    generate(args.dsn, args.meetings or SCALES[args.scale], args.seed, args.drop)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,69 @@ Diagnostic script to check workgroups table in Supabase.
 This will help identify why only 1 workgroup is showing in the Supabase table editor.
 """
 
-from connect import cursor, get_tables, fetch_table
+import time
+
+from connect import cursor, get_tables
+from role_discovery import discover_roles, format_estimate
+
+SAMPLE_ROWS = 5
+
+
+def probe(label, sql, params=None):
+    """
+    Run one diagnostic query, print how long it took and return its rows.
+    Without params the SQL is sent as-is, so LIKE patterns use a single %.
+    """
+    start = time.perf_counter()
+    cursor.execute(sql, params)
+    rows = cursor.fetchall()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"  [{elapsed_ms:8.1f} ms] {label}")
+    return rows
+
+
+def fetch_catalog_info(tables):
+    """
+    Fetch RLS status, row estimate and policies for all tables in one
+    catalog query.
+
+    Returns:
+        dict: table -> {'rls_enabled', 'estimated_rows', 'policies': [...]}
+    """
+    rows = probe(
+        f"catalog: pg_tables + pg_class + pg_policies ({len(tables)} tables)",
+        """
+        SELECT t.tablename, t.rowsecurity, c.reltuples::bigint,
+               p.policyname, p.permissive, p.roles, p.cmd, p.qual
+        FROM pg_tables t
+        JOIN pg_class c
+          ON c.relname = t.tablename
+         AND c.relnamespace = 'public'::regnamespace
+        LEFT JOIN pg_policies p
+          ON p.schemaname = t.schemaname
+         AND p.tablename = t.tablename
+        WHERE t.schemaname = 'public'
+          AND t.tablename = ANY(%s)
+        """,
+        (list(tables),),
+    )
+    info = {}
+    for tablename, rls, estimate, policyname, permissive, roles, cmd, qual in rows:
+        entry = info.setdefault(tablename, {
+            "rls_enabled": rls,
+            "estimated_rows": estimate,
+            "policies": [],
+        })
+        if policyname is not None:
+            entry["policies"].append({
+                "name": policyname,
+                "permissive": permissive,
+                "roles": roles,
+                "cmd": cmd,
+                "qual": qual,
+            })
+    return info
+
 
 def main():
     print("=" * 60)
@@ -17,113 +79,107 @@ def main():
     for table in tables:
         print(f"  - {table}")
     
-    # Look for workgroup-related tables
-    workgroup_tables = [t for t in tables if 'workgroup' in t.lower()]
+    # Look for workgroup-related tables and columns (one catalog query)
+    start = time.perf_counter()
+    matches = discover_roles(["workgroup"])["workgroup"]
+    print(f"\n  [{(time.perf_counter() - start) * 1000:8.1f} ms] catalog: role discovery for 'workgroup'")
+    workgroup_tables = [m['table'] for m in matches if m['type'] == 'table_name']
     
     if not workgroup_tables:
         print("\n⚠️  No table with 'workgroup' in the name found.")
         print("   Checking all tables for workgroup-related data...")
         
-        # Check each table for workgroup columns
-        for table in tables:
-            cursor.execute("""
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_schema = 'public' 
-                  AND table_name = %s
-                  AND column_name ILIKE '%workgroup%'
-            """, (table,))
-            cols = cursor.fetchall()
-            if cols:
-                print(f"\n  Found workgroup columns in '{table}':")
-                for col in cols:
-                    print(f"    - {col[0]}")
+        for m in matches:
+            if m['type'] == 'column':
+                print(f"\n  Found workgroup columns in '{m['table']}' "
+                      f"(rows: {format_estimate(m['estimated_rows'])}):")
+                for col in m['columns']:
+                    print(f"    - {col}")
     else:
         print(f"\n✓ Found {len(workgroup_tables)} workgroup table(s):")
         for table in workgroup_tables:
             print(f"  - {table}")
     
+    catalog = fetch_catalog_info(workgroup_tables) if workgroup_tables else {}
+    
     # Check each workgroup table
     for table in workgroup_tables:
         print(f"\n{'=' * 60}")
         print(f"Analyzing table: {table}")
         print(f"{'=' * 60}")
+        info = catalog.get(table, {"rls_enabled": False, "estimated_rows": -1, "policies": []})
+        
+        # Planner estimate first: free, and enough to size the table
+        estimate = info["estimated_rows"]
+        if estimate is not None and estimate >= 0:
+            print(f"\nEstimated rows (pg_class.reltuples): {estimate}")
+        else:
+            print("\nEstimated rows: unknown (table never analyzed)")
         
         # Count total rows
-        cursor.execute(f"SELECT COUNT(*) FROM {table}")
-        total_count = cursor.fetchone()[0]
-        print(f"\nTotal rows in database: {total_count}")
+        total_count = probe(f"SELECT COUNT(*) FROM {table}",
+                            f"SELECT COUNT(*) FROM {table}")[0][0]
+        print(f"Total rows in database: {total_count}")
         
         # Check for RLS policies
-        cursor.execute("""
-            SELECT schemaname, tablename, policyname, permissive, roles, cmd, qual
-            FROM pg_policies 
-            WHERE tablename = %s
-        """, (table,))
-        policies = cursor.fetchall()
-        
+        policies = info["policies"]
         if policies:
             print(f"\n⚠️  Row Level Security (RLS) policies found: {len(policies)}")
             print("   These policies may filter what you see in Supabase UI:")
             for policy in policies:
-                print(f"     - Policy: {policy[2]}")
-                print(f"       Command: {policy[5]}")
-                print(f"       Roles: {policy[4]}")
-                if policy[6]:
-                    print(f"       Condition: {policy[6]}")
+                print(f"     - Policy: {policy['name']}")
+                print(f"       Command: {policy['cmd']}")
+                print(f"       Roles: {policy['roles']}")
+                if policy['qual']:
+                    print(f"       Condition: {policy['qual']}")
         else:
             print("\n✓ No RLS policies found (all rows should be visible)")
         
         # Check if RLS is enabled
-        cursor.execute("""
-            SELECT tablename, rowsecurity 
-            FROM pg_tables 
-            WHERE schemaname = 'public' 
-              AND tablename = %s
-        """, (table,))
-        rls_info = cursor.fetchall()
-        if rls_info:
-            rls_enabled = rls_info[0][1]
-            if rls_enabled:
-                print("\n⚠️  RLS (Row Level Security) is ENABLED on this table")
-                print("   This means policies may be filtering results in Supabase UI")
-            else:
-                print("\n✓ RLS is disabled (all rows should be visible)")
+        if info["rls_enabled"]:
+            print("\n⚠️  RLS (Row Level Security) is ENABLED on this table")
+            print("   This means policies may be filtering results in Supabase UI")
+        else:
+            print("\n✓ RLS is disabled (all rows should be visible)")
         
-        # Fetch all rows to see what we get
-        print(f"\nFetching all rows from {table}...")
+        # Sample a few rows instead of fetching the whole table
+        print(f"\nSampling rows from {table}...")
         try:
-            rows = fetch_table(table)
-            print(f"✓ Retrieved {len(rows)} rows via Python connection")
+            sample = probe(f"SELECT * FROM {table} LIMIT {SAMPLE_ROWS}",
+                           f"SELECT * FROM {table} LIMIT %s", (SAMPLE_ROWS,))
+            cols = [c[0] for c in cursor.description or ()]
+            rows = [dict(zip(cols, row)) for row in sample]
             
-            if len(rows) != total_count:
-                print(f"\n⚠️  MISMATCH: Database has {total_count} rows, but fetch_table() got {len(rows)}")
+            if total_count > 0 and not rows:
+                print(f"\n⚠️  MISMATCH: Database has {total_count} rows, but the sample returned none")
                 print("   This suggests filtering is happening somewhere.")
             else:
-                print(f"✓ Row count matches: {len(rows)} rows")
+                print(f"✓ Python connection can read rows ({total_count} total)")
             
             # Show first few rows
             if rows:
-                print(f"\nFirst {min(5, len(rows))} rows:")
-                for i, row in enumerate(rows[:5], 1):
+                print(f"\nFirst {len(rows)} rows:")
+                for i, row in enumerate(rows, 1):
                     print(f"  {i}. {row}")
             
         except Exception as e:
-            print(f"✗ Error fetching rows: {e}")
-        
-        # Check for views that might be filtering
-        cursor.execute("""
-            SELECT table_name 
-            FROM information_schema.views 
-            WHERE table_schema = 'public'
-              AND table_name ILIKE '%workgroup%'
-        """)
-        views = cursor.fetchall()
-        if views:
-            print(f"\n⚠️  Found {len(views)} view(s) with 'workgroup' in name:")
-            for view in views:
-                print(f"     - {view[0]}")
-            print("   Make sure you're looking at the TABLE, not a VIEW in Supabase UI")
+            print(f"✗ Error sampling rows: {e}")
+    
+    # Check for views that might be filtering
+    views = probe(
+        "catalog: views with 'workgroup' in name",
+        """
+        SELECT table_name 
+        FROM information_schema.views 
+        WHERE table_schema = 'public'
+          AND table_name ILIKE '%workgroup%'
+        """,
+    )
+    if views:
+        print(f"\n⚠️  Found {len(views)} view(s) with 'workgroup' in name:")
+        for view in views:
+            print(f"     - {view[0]}")
+        print("   Make sure you're looking at the TABLE, not a VIEW in Supabase UI")
     
     print("\n" + "=" * 60)
     print("Common reasons for missing rows in Supabase UI:")
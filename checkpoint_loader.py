@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Checkpointed, resumable loading with progress reporting.
+
+`load_all` restarts from scratch if it dies part way (a panic, an OOM or a
+dropped connection). `load_all_checkpointed` instead loads each table in
+keyset chunks (WHERE id > last ORDER BY id LIMIT n). Every committed chunk
+is written as a MeTTa shard into the checkpoint directory and recorded in
+`checkpoint.json`, so a rerun continues after the last committed chunk:
+
+- into a fresh space: committed shards are replayed from disk (no SQL),
+  then loading continues from the database;
+- into the snapshot only (interp=None): nothing is loaded, the directory
+  is completed as an export.
+
+When every table is done a manifest.json is written, so the checkpoint
+directory is also a normal snapshot for export_metta.load_metta_files.
+
+While running it reports rows/s, atoms/s and an ETA based on the planner's
+row estimates.
+
+Usage:
+    python checkpoint_loader.py CHECKPOINT_DIR [--chunk-size N] [--gzip] [--snapshot-only]
+"""
+
+import argparse
+import json
+import os
+import time
+
+from connect import (
+    estimate_row_count,
+    fetch_after,
+    fetch_table,
+    get_columns,
+    get_space_state,
+    get_tables,
+    new_space_state,
+    record_row,
+    row_to_atoms,
+)
+from export_metta import (
+    MANIFEST_NAME,
+    load_metta_file,
+    load_metta_text,
+    open_shard,
+    shard_filename,
+)
+from space_state import add_table_stats, empty_table_stats, merge_stats, table_space
+
+CHECKPOINT_NAME = "checkpoint.json"
+
+
+# -------------------------------------------------------------
+# CHECKPOINT FILE
+# -------------------------------------------------------------
+def read_checkpoint(directory):
+    """Return the checkpoint in `directory`, or None if there is none yet."""
+    path = os.path.join(directory, CHECKPOINT_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_json(directory, name, data):
+    # Write-then-rename: a crash never leaves a half-written checkpoint
+    tmp_path = os.path.join(directory, name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, default=str)
+    os.replace(tmp_path, os.path.join(directory, name))
+
+
+def _append_ids(directory, table, record_ids):
+    """Append one chunk's surrogate ID assignments (compact layouts)."""
+    with open(os.path.join(directory, f"{table}.ids.jsonl"), "a", encoding="utf-8") as f:
+        f.write(json.dumps(record_ids, default=str))
+        f.write("\n")
+
+
+def _truncate_ids(directory, table, chunks):
+    """
+    Drop ID lines past the first `chunks`: a run that died between appending
+    a chunk's IDs and committing checkpoint.json leaves one behind, and the
+    resumed run appends after it.
+    """
+    path = os.path.join(directory, f"{table}.ids.jsonl")
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as f:
+        lines = f.readlines()
+    if len(lines) > chunks:
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(lines[:chunks])
+        os.replace(tmp_path, path)
+
+
+def _read_ids(directory, table, chunks):
+    """Read the surrogate IDs of the first `chunks` committed chunks."""
+    path = os.path.join(directory, f"{table}.ids.jsonl")
+    record_ids = []
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for i, line in enumerate(f):
+                if i >= chunks:
+                    break  # written by a chunk that was never committed
+                record_ids.extend(json.loads(line))
+    return record_ids
+
+
+# -------------------------------------------------------------
+# PROGRESS
+# -------------------------------------------------------------
+def _format_eta(seconds):
+    if seconds is None:
+        return "unknown"
+    seconds = int(seconds)
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m{seconds % 60:02d}s"
+
+
+def _report(table, tp, estimate, run):
+    elapsed = max(time.perf_counter() - run["start"], 1e-9)
+    rows_per_s = run["rows"] / elapsed
+    atoms_per_s = run["atoms"] / elapsed
+    remaining = max(run["estimated_total"] - run["done_rows"], 0)
+    eta = remaining / rows_per_s if rows_per_s > 0 else None
+    of = f"/~{estimate}" if estimate >= 0 else ""
+    print(f"  {table}: {tp['rows']}{of} rows | {rows_per_s:,.0f} rows/s | "
+          f"{atoms_per_s:,.0f} atoms/s | ETA {_format_eta(eta)}")
+
+
+# -------------------------------------------------------------
+# LOADER
+# -------------------------------------------------------------
+def _replay(interp, directory, state, table, tp):
+    """Load a table's committed shards from disk into a fresh space."""
+    if state["layout"] != "property":
+        record_ids = _read_ids(directory, table, len(tp["shards"]))
+        state["record_ids"][table] = record_ids
+        state["ids"][table] = {rid: sid for sid, rid in enumerate(record_ids)}
+    if tp.get("columns"):
+        state["columns"][table] = tp["columns"]
+    token, space = table_space(interp, table)
+    for shard in tp["shards"]:
+        load_metta_file(interp, os.path.join(directory, shard["file"]),
+                        None if token == "&self" else space)
+    merge_stats(state, table, tp.get("stats", {}))
+
+
+def _commit_chunk(interp, directory, state, table, rows, tp, compress):
+    """Write a chunk as a shard, load it, and record it in the checkpoint entry."""
+    index = len(tp["shards"])
+    first_sid = len(state["record_ids"].get(table, []))
+    chunk_state = new_space_state(state["layout"])
+
+    lines = [f"; table: {table} shard: {index}"]
+    atoms = 0
+    for row in rows:
+        row_atoms = row_to_atoms(table, row, state["layout"], state, accounting=chunk_state)
+        lines.extend(row_atoms)
+        atoms += len(row_atoms)
+        record_row(chunk_state, table, row_atoms)
+    text = "\n".join(lines) + "\n"
+
+    # Write-then-rename; the "tmp." prefix keeps the .gz suffix open_shard looks at
+    name = shard_filename(table, index, compress)
+    tmp_path = os.path.join(directory, "tmp." + name)
+    with open_shard(tmp_path, "w") as out:
+        out.write(text)
+    os.replace(tmp_path, os.path.join(directory, name))
+
+    if interp is not None:
+        # One parse for the whole chunk
+        token, space = table_space(interp, table)
+        load_metta_text(interp, text, None if token == "&self" else space)
+        merge_stats(get_space_state(interp), table, chunk_state["stats"].get(table, {}))
+
+    if state["layout"] != "property":
+        _append_ids(directory, table, state["record_ids"][table][first_sid:])
+        if state["layout"] == "row":
+            tp["columns"] = state["columns"].get(table, [])
+
+    tp["shards"].append({"file": name, "rows": len(rows), "atoms": atoms})
+    tp["rows"] += len(rows)
+    tp["atoms"] += atoms
+    add_table_stats(tp.setdefault("stats", empty_table_stats()), chunk_state["stats"].get(table, {}))
+    return atoms
+
+
+def load_all_checkpointed(interp, directory, chunk_size=5000, tables=None,
+                          compress=False, layout=None):
+    """
+    Load every table in committed chunks, resuming from `directory`.
+
+    Args:
+        interp: MeTTa interpreter, or None to only build the snapshot
+        directory: Checkpoint directory (created if missing)
+        chunk_size: Rows per committed chunk (default 5000)
+        tables: Optional list of tables (default: all public tables)
+        compress: gzip the chunk shards
+        layout: Atom layout for a new checkpoint (default: the
+                interpreter's layout, "property" without an interpreter);
+                a resumed checkpoint keeps its own layout
+
+    Returns:
+        The checkpoint dict (also written to directory/checkpoint.json)
+    """
+    os.makedirs(directory, exist_ok=True)
+    checkpoint = read_checkpoint(directory)
+    if checkpoint is None:
+        if layout is None:
+            layout = get_space_state(interp)["layout"] if interp is not None else "property"
+        checkpoint = {"format": 1, "layout": layout, "compress": compress, "tables": {}}
+        print(f"Starting new checkpoint in {directory}")
+    else:
+        compress = checkpoint.get("compress", compress)
+        print(f"Resuming checkpoint in {directory}")
+
+    if interp is not None:
+        state = get_space_state(interp)
+        if state["layout"] != checkpoint["layout"]:
+            if state["record_ids"] or state["stats"]:
+                raise ValueError(f"Space uses layout '{state['layout']}', checkpoint uses "
+                                 f"'{checkpoint['layout']}'")
+            state["layout"] = checkpoint["layout"]
+    else:
+        state = new_space_state(checkpoint["layout"])
+
+    if tables is None:
+        tables = get_tables()
+
+    estimates = {t: estimate_row_count(t) for t in tables}
+    run = {
+        "start": time.perf_counter(),
+        "rows": 0,
+        "atoms": 0,
+        "done_rows": sum(checkpoint["tables"].get(t, {}).get("rows", 0) for t in tables),
+        "estimated_total": sum(max(e, checkpoint["tables"].get(t, {}).get("rows", 0))
+                               for t, e in estimates.items()),
+    }
+
+    for t in tables:
+        tp = checkpoint["tables"].setdefault(
+            t, {"rows": 0, "atoms": 0, "last_id": None, "done": False, "shards": []})
+
+        # Bring a fresh space (or a fresh process' state) up to the checkpoint
+        if tp["shards"]:
+            if interp is not None and get_space_state(interp)["stats"].get(t, {}).get("rows", 0) < tp["rows"]:
+                print(f"Replaying table: {t} ({tp['rows']} rows from {len(tp['shards'])} shards)")
+                _replay(interp, directory, state, t, tp)
+            elif interp is None and state["layout"] != "property":
+                record_ids = _read_ids(directory, t, len(tp["shards"]))
+                state["record_ids"][t] = record_ids
+                state["ids"][t] = {rid: sid for sid, rid in enumerate(record_ids)}
+
+        if tp["done"]:
+            continue
+        if state["layout"] != "property":
+            _truncate_ids(directory, t, len(tp["shards"]))
+        print(f"Loading table: {t} (~{estimates[t]} rows, resuming after {tp['last_id']!r})"
+              if tp["last_id"] is not None else f"Loading table: {t} (~{estimates[t]} rows)")
+
+        if "id" not in [c[0] for c in get_columns(t)]:
+            # No key to page on: load the table as one chunk
+            rows = fetch_table(t)
+            run["atoms"] += _commit_chunk(interp, directory, state, t, rows, tp, compress)
+            run["rows"] += len(rows)
+            run["done_rows"] += len(rows)
+            tp["done"] = True
+            _write_json(directory, CHECKPOINT_NAME, checkpoint)
+            _report(t, tp, estimates[t], run)
+            continue
+
+        while True:
+            rows = fetch_after(t, tp["last_id"], chunk_size)
+            if not rows:
+                tp["done"] = True
+                _write_json(directory, CHECKPOINT_NAME, checkpoint)
+                break
+            run["atoms"] += _commit_chunk(interp, directory, state, t, rows, tp, compress)
+            run["rows"] += len(rows)
+            run["done_rows"] += len(rows)
+            tp["last_id"] = rows[-1]["id"]
+            _write_json(directory, CHECKPOINT_NAME, checkpoint)
+            _report(t, tp, estimates[t], run)
+
+    _write_manifest(directory, checkpoint, state)
+    print(f"\n✓ Checkpointed load complete: {sum(tp['atoms'] for tp in checkpoint['tables'].values())} atoms\n")
+    return checkpoint
+
+
+def _write_manifest(directory, checkpoint, state):
+    """Write an export_metta-compatible manifest for the finished checkpoint."""
+    manifest = {
+        "format": 1,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "layout": checkpoint["layout"],
+        "tables": {},
+    }
+    for t, tp in checkpoint["tables"].items():
+        entry = {"rows": tp["rows"], "atoms": tp["atoms"], "stats": tp.get("stats", {}),
+                 "shards": tp["shards"]}
+        if checkpoint["layout"] != "property":
+            ids_file = f"{t}.ids.json"
+            record_ids = _read_ids(directory, t, len(tp["shards"]))
+            with open(os.path.join(directory, ids_file), "w", encoding="utf-8") as f:
+                json.dump(record_ids, f, default=str)
+            entry["ids_file"] = ids_file
+            if tp.get("columns"):
+                entry["columns"] = tp["columns"]
+        manifest["tables"][t] = entry
+    _write_json(directory, MANIFEST_NAME, manifest)
+
+
+# -------------------------------------------------------------
+# MAIN
+# -------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Resumable, checkpointed load")
+    parser.add_argument("directory", help="Checkpoint directory (rerun with the same one to resume)")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--gzip", action="store_true", help="Compress chunk shards")
+    parser.add_argument("--snapshot-only", action="store_true",
+                        help="Only build the snapshot, do not load into a MeTTa space")
+    args = parser.parse_args()
+
+    interp = None
+    if not args.snapshot_only:
+        from hyperon import MeTTa
+        from connect import print_space_stats
+        interp = MeTTa()
+
+    load_all_checkpointed(interp, args.directory, args.chunk_size, compress=args.gzip)
+    if interp is not None:
+        print_space_stats(interp)
+
+
+if __name__ == "__main__":
+    main()
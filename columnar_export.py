@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Column-oriented (Arrow / Parquet) export of tables and query results.
+
+Analytics jobs should not have to query Postgres again for data the loader
+pipeline already streams. This module turns rows into Arrow record batches
+typed by the table's schema and writes them as Parquet or Arrow IPC files:
+
+- iter_record_batches(table) streams a table (iter_table) as record batches;
+- write_table / export_tables write one <table>.parquet or <table>.arrow per table;
+- load_all(interp, columnar_dir=...) writes the same files from the rows it loads;
+- query_batch_record_batch turns query_batch results into one record batch;
+- read_table opens a file again; Arrow IPC files are memory-mapped (zero copy).
+
+Column types follow information_schema.data_type: integers, floats, booleans,
+dates and timestamps map to their Arrow types, numeric to float64 (exact
+values stay in Postgres), JSON to its JSON text and everything else to string.
+
+pyarrow is optional (pip install pyarrow); everything else in this
+repository works without it.
+
+Usage:
+    python columnar_export.py OUT_DIR [--format arrow|parquet] [--tables t1 t2 ...]
+"""
+
+import argparse
+import json
+import os
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency
+    pa = pq = None
+
+from connect import column_types, decode_columns, get_tables, iter_table, query_batch
+
+FORMATS = {"arrow": ".arrow", "parquet": ".parquet"}
+DEFAULT_BATCH_SIZE = 10000
+PYARROW_MISSING = "columnar_export requires pyarrow (pip install pyarrow)"
+
+
+def _json_text(value):
+    return json.dumps(value, default=str)
+
+
+def _column_spec(data_type):
+    """(arrow type, converter for non-null values) for an information_schema data_type."""
+    if pa is None:
+        raise ImportError(PYARROW_MISSING)
+    if data_type in ("smallint", "integer", "bigint"):
+        return {"smallint": pa.int16(), "integer": pa.int32(), "bigint": pa.int64()}[data_type], int
+    if data_type in ("real", "double precision", "numeric"):
+        return pa.float64(), float
+    if data_type == "boolean":
+        return pa.bool_(), bool
+    if data_type == "date":
+        return pa.date32(), None
+    if data_type == "timestamp with time zone":
+        return pa.timestamp("us", tz="UTC"), None
+    if data_type == "timestamp without time zone":
+        return pa.timestamp("us"), None
+    if data_type in ("json", "jsonb"):
+        return pa.string(), _json_text
+    return pa.string(), str
+
+
+def arrow_schema(table, columns=None):
+    """Arrow schema of a table (or of the given columns of it)."""
+    if pa is None:
+        raise ImportError(PYARROW_MISSING)
+    types = column_types(table)
+    names = columns or list(types)
+    return pa.schema([(name, _column_spec(types.get(name))[0]) for name in names])
+
+
+def columns_to_record_batch(table, columns):
+    """Build a record batch from {column: [python values]} of a table."""
+    if pa is None:
+        raise ImportError(PYARROW_MISSING)
+    types = column_types(table)
+    arrays = []
+    for name, values in columns.items():
+        arrow_type, convert = _column_spec(types.get(name))
+        if convert is not None:
+            values = [None if v is None else convert(v) for v in values]
+        arrays.append(pa.array(values, type=arrow_type))
+    return pa.RecordBatch.from_arrays(arrays, names=list(columns))
+
+
+def rows_to_record_batch(table, rows, columns=None):
+    """Build a record batch from database rows (dicts, e.g. from fetch_table)."""
+    names = columns or list(column_types(table))
+    return columns_to_record_batch(table, {name: [row.get(name) for row in rows] for name in names})
+
+
+def iter_record_batches(table, batch_size=DEFAULT_BATCH_SIZE):
+    """Stream a table from the database as record batches of up to `batch_size` rows."""
+    if pa is None:
+        raise ImportError(PYARROW_MISSING)
+    names = list(column_types(table))
+    rows = []
+    for row in iter_table(table, batch_size):
+        rows.append(row)
+        if len(rows) >= batch_size:
+            yield rows_to_record_batch(table, rows, names)
+            rows = []
+    if rows:
+        yield rows_to_record_batch(table, rows, names)
+
+
+def query_batch_record_batch(interp, table, record_ids, properties, batch_size=50):
+    """query_batch, decoded (see connect.decode_columns) into one record batch."""
+    results = query_batch(interp, table, record_ids, properties, batch_size)
+    return columns_to_record_batch(table, decode_columns(table, results, properties))
+
+
+# -------------------------------------------------------------
+# FILES
+# -------------------------------------------------------------
+class ColumnarWriter:
+    """Write record batches of one table to a Parquet or Arrow IPC file."""
+
+    def __init__(self, path, schema, fmt="arrow"):
+        if pa is None or pq is None:
+            raise ImportError(PYARROW_MISSING)
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format '{fmt}', expected one of {tuple(FORMATS)}")
+        self.path = path
+        self.fmt = fmt
+        self.rows = 0
+        if fmt == "parquet":
+            self._writer = pq.ParquetWriter(path, schema)
+        else:
+            self._writer = pa.ipc.new_file(path, schema)
+
+    def write(self, batch):
+        self._writer.write_batch(batch)
+        self.rows += batch.num_rows
+
+    def close(self):
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def table_path(out_dir, table, fmt="arrow"):
+    return os.path.join(out_dir, table + FORMATS[fmt])
+
+
+def write_rows(table, rows, out_dir, fmt="arrow", batch_size=DEFAULT_BATCH_SIZE):
+    """Write rows already fetched (e.g. by load_all) to <out_dir>/<table>.<fmt>."""
+    os.makedirs(out_dir, exist_ok=True)
+    path = table_path(out_dir, table, fmt)
+    names = list(column_types(table))
+    with ColumnarWriter(path, arrow_schema(table, names), fmt) as writer:
+        for i in range(0, len(rows), batch_size):
+            writer.write(rows_to_record_batch(table, rows[i:i + batch_size], names))
+    return path
+
+
+def write_table(table, out_dir, fmt="arrow", batch_size=DEFAULT_BATCH_SIZE):
+    """Stream a table from the database into <out_dir>/<table>.<fmt>. Returns (path, rows)."""
+    os.makedirs(out_dir, exist_ok=True)
+    path = table_path(out_dir, table, fmt)
+    with ColumnarWriter(path, arrow_schema(table), fmt) as writer:
+        for batch in iter_record_batches(table, batch_size):
+            writer.write(batch)
+    return path, writer.rows
+
+
+def export_tables(out_dir, tables=None, fmt="arrow", batch_size=DEFAULT_BATCH_SIZE):
+    """Write every table (or the given subset). Returns {table: (path, rows)}."""
+    if tables is None:
+        tables = get_tables()
+    written = {}
+    for t in tables:
+        written[t] = write_table(t, out_dir, fmt, batch_size)
+        print(f"Exported table: {t} ({written[t][1]} rows) -> {written[t][0]}")
+    return written
+
+
+def read_table(path):
+    """
+    Open a file written here as a pyarrow Table. Arrow IPC files are
+    memory-mapped, so their columns are read without copying.
+    """
+    if pa is None or pq is None:
+        raise ImportError(PYARROW_MISSING)
+    if path.endswith(FORMATS["parquet"]):
+        return pq.read_table(path, memory_map=True)
+    with pa.memory_map(path, "r") as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export tables as Arrow IPC or Parquet files")
+    parser.add_argument("out_dir", help="Directory to write <table>.arrow / <table>.parquet to")
+    parser.add_argument("--format", default="arrow", choices=tuple(FORMATS))
+    parser.add_argument("--tables", nargs="*", help="Only export these tables")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    written = export_tables(args.out_dir, args.tables, args.format, args.batch_size)
+    print(f"\n✓ Exported {sum(rows for _, rows in written.values())} rows to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
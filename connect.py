@@ -1,11 +1,48 @@
 #!/usr/bin/env python3
 import os
+import re
+import sys
+import ast
+import json
+import time
+import hashlib
 import psycopg2
+import psycopg2.extensions
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time as dtime
+from decimal import Decimal, InvalidOperation
 from urllib.parse import urlparse
 from pprint import pprint
 from dotenv import load_dotenv
 
-from hyperon import MeTTa
+from hyperon import AtomKind, E, ExpressionAtom, MeTTa, RunnerState, VariableAtom
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency: columnar results as arrays
+    np = None
+
+from text_index import set_text_index
+from aggregates import refresh_aggregate_atoms, set_aggregates
+from row_store import RowStore
+from space_state import (
+    InterpreterMap,
+    LAYOUTS,
+    new_space_state,
+    get_space_state,
+    attach_space_state,
+    set_layout,
+    assign_surrogate_id,
+    record_row,
+    get_space_stats,
+    set_partitions,
+    table_space,
+    set_elision,
+    record_elided,
+    set_text_policies,
+    write_blob,
+    read_blob,
+)
 
 # -------------------------------------------------------------
 # ENV + CONFIG
@@ -20,20 +57,351 @@ if not DATABASE_URL:
 if not DB_PASSWORD:
     raise ValueError("DB_PASSWORD missing")
 
+# -------------------------------------------------------------
+# INSTRUMENTATION
+# -------------------------------------------------------------
+# None while disabled: every hot-path hook checks this one global and
+# falls straight through to the plain call.
+_instrumentation = None
+
+
+def enable_instrumentation(capture_text=False, spans=False, max_spans=100000):
+    """
+    Start recording timings of SQL statements, MeTTa queries and row encoding.
+
+    Every SQL statement run through the module cursor (including scripts
+    calling cursor.execute directly) and every interp.run issued by the
+    helpers in this module is recorded under its statement / query
+    template: count, total time and a log2 latency histogram.
+
+    Args:
+        capture_text: Also keep the full query text on recorded spans
+        spans: Keep individual spans for export_spans()
+        max_spans: Maximum number of spans kept in memory
+
+    Returns:
+        The instrumentation state dict
+    """
+    global _instrumentation
+    _instrumentation = {
+        "capture_text": capture_text,
+        "spans": [] if spans else None,
+        "max_spans": max_spans,
+        "dropped_spans": 0,
+        "trace_id": os.urandom(16).hex(),
+        "stats": {},
+    }
+    return _instrumentation
+
+
+def disable_instrumentation():
+    """Stop recording. Returns the recorded state (or None)."""
+    global _instrumentation
+    state, _instrumentation = _instrumentation, None
+    return state
+
+
+def _record(kind, name, start_ns, duration_ns, text=None):
+    state = _instrumentation
+    if state is None:
+        return
+    key = (kind, name)
+    st = state["stats"].get(key)
+    if st is None:
+        st = state["stats"][key] = {"count": 0, "total_ns": 0, "max_ns": 0, "histogram": {}}
+    st["count"] += 1
+    st["total_ns"] += duration_ns
+    if duration_ns > st["max_ns"]:
+        st["max_ns"] = duration_ns
+    bucket = 1 << (duration_ns // 1000).bit_length()  # upper bound in microseconds
+    st["histogram"][bucket] = st["histogram"].get(bucket, 0) + 1
+
+    spans = state["spans"]
+    if spans is not None:
+        if len(spans) >= state["max_spans"]:
+            state["dropped_spans"] += 1
+            return
+        span = {
+            "traceId": state["trace_id"],
+            "spanId": os.urandom(8).hex(),
+            "name": name,
+            "kind": "SPAN_KIND_CLIENT" if kind == "sql" else "SPAN_KIND_INTERNAL",
+            "startTimeUnixNano": start_ns,
+            "endTimeUnixNano": start_ns + duration_ns,
+            "attributes": {"component": kind},
+        }
+        if state["capture_text"] and text is not None:
+            span["attributes"]["db.statement" if kind == "sql" else "metta.query"] = text
+        spans.append(span)
+
+
+def _timed(kind, name, fn, *args, text=None):
+    """Call fn(*args), recording its duration when instrumentation is enabled."""
+    if _instrumentation is None:
+        return fn(*args)
+    start_ns = time.time_ns()
+    t0 = time.perf_counter_ns()
+    try:
+        return fn(*args)
+    finally:
+        _record(kind, name, start_ns, time.perf_counter_ns() - t0, text)
+
+
+def _run(interp, program, template):
+    """
+    interp.run(program), recorded under its query `template`
+    (e.g. '!(match &self (:{table}.{prop} {id} $val) $val)').
+    """
+    if _instrumentation is None:
+        return interp.run(program)
+    return _timed("metta", template, interp.run, program, text=program)
+
+
+def _run_query(interp, program, template, timeout_s=None, max_results=None):
+    """
+    _run for read queries: enforces the query limits (set_query_limits,
+    or timeout_s / max_results for this call) via run_guarded.
+    """
+    if _query_limits is None and timeout_s is None and max_results is None:
+        return _run(interp, program, template)
+    if _instrumentation is None:
+        return run_guarded(interp, program, timeout_s, max_results)
+    return _timed("metta", template, run_guarded, interp, program, timeout_s, max_results,
+                  text=program)
+
+
+class InstrumentedCursor(psycopg2.extensions.cursor):
+    """Cursor whose execute() is recorded while instrumentation is enabled."""
+
+    def execute(self, query, vars=None):
+        if _instrumentation is None:
+            return super().execute(query, vars)
+        text = query if isinstance(query, str) else str(query)
+        name = " ".join(text.split())[:120]
+        return _timed("sql", name, super().execute, query, vars, text=text)
+
+
+def instrumentation_summary():
+    """
+    Return the recorded timings, slowest total first.
+
+    Returns:
+        List of dicts: kind ('sql', 'metta' or 'encode'), name, count,
+        total_ms, mean_ms, max_ms, histogram {upper_bound_us: count}
+    """
+    if _instrumentation is None:
+        return []
+    rows = []
+    for (kind, name), st in _instrumentation["stats"].items():
+        rows.append({
+            "kind": kind,
+            "name": name,
+            "count": st["count"],
+            "total_ms": st["total_ns"] / 1e6,
+            "mean_ms": st["total_ns"] / st["count"] / 1e6,
+            "max_ms": st["max_ns"] / 1e6,
+            "histogram": dict(sorted(st["histogram"].items())),
+        })
+    return sorted(rows, key=lambda r: -r["total_ms"])
+
+
+def print_instrumentation_summary(limit=20):
+    """Print the recorded timings as a table."""
+    rows = instrumentation_summary()
+    if not rows:
+        print("No instrumentation recorded (call enable_instrumentation() first).")
+        return
+    grand_total = sum(r["total_ms"] for r in rows) or 1
+    print(f"{'kind':7s} {'count':>8s} {'total ms':>11s} {'%':>6s} {'mean ms':>9s} {'max ms':>9s}  name")
+    for r in rows[:limit]:
+        print(f"{r['kind']:7s} {r['count']:8d} {r['total_ms']:11.1f} "
+              f"{100 * r['total_ms'] / grand_total:5.1f}% {r['mean_ms']:9.3f} "
+              f"{r['max_ms']:9.3f}  {r['name'][:70]}")
+    if len(rows) > limit:
+        print(f"... and {len(rows) - limit} more")
+
+
+def export_spans(path):
+    """
+    Write recorded spans as OpenTelemetry-style JSON, one span per line.
+    Requires enable_instrumentation(spans=True). Returns the span count.
+    """
+    if _instrumentation is None or _instrumentation["spans"] is None:
+        return 0
+    with open(path, "w", encoding="utf-8") as f:
+        for span in _instrumentation["spans"]:
+            f.write(json.dumps(span))
+            f.write("\n")
+    return len(_instrumentation["spans"])
+
+
+# -------------------------------------------------------------
+# QUERY LIMITS
+# -------------------------------------------------------------
+# None while no default limits are set: queries go straight to interp.run.
+_query_limits = None
+
+# Steps between result-count checks (counting converts the results so far)
+RESULT_CHECK_STEPS = 64
+
+
+class QueryLimitExceeded(RuntimeError):
+    """A guarded query was aborted; `results` holds what was found so far."""
+
+    def __init__(self, message, results=None):
+        super().__init__(message)
+        self.results = results or []
+
+
+class QueryTimeout(QueryLimitExceeded):
+    pass
+
+
+class ResultLimitExceeded(QueryLimitExceeded):
+    pass
+
+
+def set_query_limits(timeout_s=None, max_results=None):
+    """
+    Set default limits for every query issued by the helpers in this module
+    (query_by_id, query_by_property_value, list_atom_types verification, ...).
+
+    Args:
+        timeout_s: Wall-clock seconds per MeTTa query (None: unlimited)
+        max_results: Maximum results per query (None: unlimited)
+
+    Pass neither to remove the limits. Loading (add-atom) is never limited.
+    """
+    global _query_limits
+    if timeout_s is None and max_results is None:
+        _query_limits = None
+    else:
+        _query_limits = {"timeout_s": timeout_s, "max_results": max_results}
+    return _query_limits
+
+
+def _current_results(runner):
+    """A runner's results so far: one list of atoms per top-level expression."""
+    # current_results() returns the nested lists unless flat=True; the
+    # isinstance check only tells the type checker so
+    return [r for r in runner.current_results() if isinstance(r, list)]
+
+
+def _count_results(results):
+    return sum(len(r) for r in results)
+
+
+def iter_guarded(interp, program, timeout_s=None, max_results=None):
+    """
+    Run a MeTTa program step by step, yielding result atoms as the
+    interpreter produces them.
+
+    The program runs in a RunnerState; between steps the wall-clock
+    deadline and the result count are checked, and the run is abandoned
+    (its state freed, nothing else executed) as soon as a limit is hit.
+    The interpreter publishes results per top-level expression, so a
+    single large `match` still arrives at once; the limits keep it from
+    being returned or growing further.
+
+    Args:
+        interp: MeTTa interpreter
+        program: MeTTa program text
+        timeout_s: Seconds before QueryTimeout (default: set_query_limits)
+        max_results: Results before ResultLimitExceeded (default: set_query_limits)
+
+    Yields:
+        (expression_index, atom) for each result
+    """
+    limits = _query_limits or {}
+    if timeout_s is None:
+        timeout_s = limits.get("timeout_s")
+    if max_results is None:
+        max_results = limits.get("max_results")
+    deadline = None if timeout_s is None else time.perf_counter() + timeout_s
+
+    runner = RunnerState(interp, program)
+    emitted = []  # results already yielded, per top-level expression
+    steps = 0
+    while True:
+        complete = runner.is_complete()
+        if not complete:
+            runner.run_step()
+            steps += 1
+        if complete or steps % RESULT_CHECK_STEPS == 0:
+            results = _current_results(runner)
+            if max_results is not None and _count_results(results) > max_results:
+                raise ResultLimitExceeded(
+                    f"query produced more than {max_results} results",
+                    [atom for r in results for atom in r][:max_results])
+            for i, result in enumerate(results):
+                if i == len(emitted):
+                    emitted.append(0)
+                for atom in result[emitted[i]:]:
+                    yield i, atom
+                emitted[i] = len(result)
+            if complete:
+                return
+        if deadline is not None and time.perf_counter() > deadline:
+            raise QueryTimeout(f"query exceeded {timeout_s}s",
+                               [atom for r in _current_results(runner) for atom in r])
+
+
+def run_guarded(interp, program, timeout_s=None, max_results=None):
+    """
+    interp.run(program) with a wall-clock timeout and a result-count limit.
+
+    Returns the same nested lists as interp.run; raises QueryTimeout or
+    ResultLimitExceeded (both QueryLimitExceeded) when a limit is hit.
+    """
+    results = []
+    for i, atom in iter_guarded(interp, program, timeout_s, max_results):
+        while len(results) <= i:
+            results.append([])
+        results[i].append(atom)
+    return results
+
+
 # -------------------------------------------------------------
 # DATABASE CONNECTION
 # -------------------------------------------------------------
 url = urlparse(DATABASE_URL)
 
-conn = psycopg2.connect(
-    dbname=url.path[1:],
-    user=url.username,
-    password=DB_PASSWORD,
-    host=url.hostname,
-    port=url.port
-)
+# Opened on first use: importing this module (async_connect.py, shard
+# workers, DB-free loaders) never connects by itself.
+_connection = None
+
+
+def get_connection():
+    """The module's psycopg2 connection, opened on first use."""
+    global _connection
+    if _connection is None:
+        _connection = psycopg2.connect(
+            dbname=url.path[1:],
+            user=url.username,
+            password=DB_PASSWORD,
+            host=url.hostname,
+            port=url.port
+        )
+        # Every cursor of this connection (named ones too) reports to the instrumentation
+        _connection.cursor_factory = InstrumentedCursor
+    return _connection
+
+
+class _OnFirstUse:
+    """Stands in for an object created by `factory` when first used."""
 
-cursor = conn.cursor()
+    def __init__(self, factory):
+        self._factory = factory
+        self._target = None
+
+    def __getattr__(self, name):
+        if self._target is None:
+            self._target = self._factory()
+        return getattr(self._target, name)
+
+
+conn = _OnFirstUse(get_connection)
+cursor = _OnFirstUse(lambda: get_connection().cursor())
 
 
 # -------------------------------------------------------------
@@ -91,7 +459,34 @@ def get_full_schema():
 # -------------------------------------------------------------
 # DATA FETCH
 # -------------------------------------------------------------
-def fetch_table(table):
+# None unless set_row_store was called: tables are read from Postgres.
+_row_store = None
+
+
+def set_row_store(directory=None):
+    """
+    Read tables from a local row store (see row_store.py) instead of
+    Postgres: fetch_table and iter_table (and so the loaders) serve the
+    tables the store has from its memory-mapped files. None switches back.
+
+    Returns:
+        The RowStore, or None
+    """
+    global _row_store
+    if _row_store is not None:
+        _row_store.close()
+    _row_store = RowStore(directory) if directory else None
+    return _row_store
+
+
+def get_row_store():
+    """The RowStore set by set_row_store, or None."""
+    return _row_store
+
+
+def fetch_table(table, use_row_store=True):
+    if use_row_store and _row_store is not None and _row_store.has_table(table):
+        return _row_store.fetch_table(table)
     cursor.execute(f"SELECT * FROM {table}")
     if cursor.description is None:
         return []
@@ -99,6 +494,146 @@ def fetch_table(table):
     return [dict(zip(cols, row)) for row in cursor.fetchall()]
 
 
+def sample_id(table):
+    """
+    Return one ID from a table (LIMIT 1), or None if the table is empty
+    or has no id column. Never reads more than one row.
+    """
+    if "id" not in [col[0] for col in get_columns(table)]:
+        return None
+    cursor.execute(f"SELECT id FROM {table} LIMIT 1")
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def estimate_row_count(table):
+    """
+    Planner estimate of a table's row count (pg_class.reltuples).
+    Free to call on any table size; returns -1 if never analyzed.
+    """
+    cursor.execute("""
+        SELECT COALESCE(reltuples, -1)::bigint
+        FROM pg_class
+        WHERE relname = %s
+          AND relnamespace = 'public'::regnamespace;
+    """, (table,))
+    row = cursor.fetchone()
+    return row[0] if row else -1
+
+
+def fetch_after(table, after_id=None, limit=5000, columns="*", where=None, params=()):
+    """
+    Fetch one keyset page: up to `limit` rows with id > after_id, ordered by id.
+
+    Unlike LIMIT/OFFSET, each page costs the same no matter how deep into
+    the table it is (the id index is used to seek to after_id).
+
+    Args:
+        table: Table name
+        after_id: Last id of the previous page (None for the first page)
+        limit: Page size
+        columns: Column list to select (must include id), default "*"
+        where: Optional extra SQL condition, e.g. "status = %s"
+        params: Parameters for `where`
+
+    Returns:
+        List of row dicts
+    """
+    return _keyset_page(cursor, table, after_id, limit, columns, where, params)
+
+
+def _keyset_page(cur, table, after_id, limit, columns="*", where=None, params=()):
+    conditions = []
+    args = []
+    if after_id is not None:
+        conditions.append("id > %s")
+        args.append(after_id)
+    if where:
+        conditions.append(f"({where})")
+        args.extend(params)
+    sql = f"SELECT {columns} FROM {table}"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY id LIMIT %s"
+    args.append(limit)
+    cur.execute(sql, args)
+    cols = [c[0] for c in cur.description]
+    return [dict(zip(cols, row)) for row in cur.fetchall()]
+
+
+def iter_id_pages(table, page_size=1000, where=None, params=(), prefetch=True):
+    """
+    Walk every matching ID of a table in deterministic keyset pages.
+
+    Each page is `SELECT id ... WHERE id > last ORDER BY id LIMIT n`, so
+    memory stays at one page and deep pages cost the same as the first.
+    With `prefetch`, the next page is fetched in a background thread (on
+    its own cursor) while the caller processes the current one.
+
+    Args:
+        table: Table name
+        page_size: IDs per page (default 1000)
+        where: Optional SQL condition, e.g. "status = %s"
+        params: Parameters for `where`
+        prefetch: Fetch the next page while the current one is processed
+
+    Yields:
+        Lists of IDs, in ascending ID order
+    """
+    with conn.cursor() as cur:
+        def fetch(after_id):
+            return [r["id"] for r in _keyset_page(cur, table, after_id, page_size,
+                                                  "id", where, params)]
+
+        if not prefetch:
+            page = fetch(None)
+            while page:
+                yield page
+                page = fetch(page[-1]) if len(page) == page_size else []
+            return
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            page = fetch(None)
+            while page:
+                pending = pool.submit(fetch, page[-1]) if len(page) == page_size else None
+                try:
+                    yield page
+                finally:
+                    if pending is not None and not pending.done():
+                        # Closed early: let the in-flight fetch finish before the cursor closes
+                        pending.result()
+                page = pending.result() if pending is not None else []
+
+
+def iter_table(table, chunk_size=5000, use_row_store=True):
+    """
+    Stream rows of a table as dicts without holding the whole table in memory.
+
+    Uses a server-side (named) cursor, so only `chunk_size` rows are
+    transferred from Postgres at a time. Tables in the row store (see
+    set_row_store) are read from it instead.
+
+    Args:
+        table: Table name
+        chunk_size: Rows fetched per round trip (default 5000)
+        use_row_store: False always reads from Postgres
+
+    Yields:
+        One dict per row, keyed by column name
+    """
+    if use_row_store and _row_store is not None and _row_store.has_table(table):
+        yield from _row_store.iter_rows(table)
+        return
+    with conn.cursor(name=f"iter_{table}") as stream:
+        stream.itersize = chunk_size
+        stream.execute(f"SELECT * FROM {table}")
+        cols = None
+        for row in stream:
+            if cols is None:
+                cols = [c[0] for c in stream.description or ()]
+            yield dict(zip(cols, row))
+
+
 # -------------------------------------------------------------
 # SAFE VALUE ENCODING
 # -------------------------------------------------------------
@@ -143,28 +678,433 @@ def encode_value(val):
         return f'"{s}"'
 
 
-def row_to_atoms(table, row):
+def encode_text(state, table, column, val, policy):
+    """
+    Encode a value under its column's text policy (see TEXT POLICIES in
+    space_state.py). None and non-text values are always encoded inline.
+    """
+    mode, arg = policy
+    if val is None or mode == "inline" or isinstance(val, (bool, int, float)):
+        return encode_value(val)
+    text = val if isinstance(val, str) else str(val)
+    if mode == "truncate":
+        return encode_value(text if len(text) <= arg else text[:arg] + "...")
+    if mode == "hash":
+        return f'"sha256:{hashlib.sha256(text.encode("utf-8")).hexdigest()}"'
+    if mode == "ref":
+        return f"(:ref {len(text)})"
+    offset, length = write_blob(state, table, column, text)
+    return f"(:blob {offset} {length})"
+
+
+def resolve_text(interp, table, record_id, column, value):
+    """
+    Return the full text behind a "ref" or "blob" value (as a Python str),
+    fetching it from Postgres or the local blob file; other values are
+    returned unchanged.
+    """
+    text = str(value)
+    if text.startswith("(:ref "):
+        cursor.execute(f"SELECT {column} FROM {table} WHERE id = %s", (record_id,))
+        row = cursor.fetchone()
+        return None if row is None else row[0]
+    if text.startswith("(:blob "):
+        _, offset, length = text[1:-1].split()
+        return read_blob(get_space_state(interp), table, column, int(offset), int(length))
+    return value
+
+
+_symbol_cache = {}
+
+
+def column_symbol(table, col):
+    """
+    Return the interned `:table.col` symbol for a column.
+    The string is built once per column instead of once per atom.
+    """
+    key = (table, col)
+    sym = _symbol_cache.get(key)
+    if sym is None:
+        sym = sys.intern(f":{table}.{col}")
+        _symbol_cache[key] = sym
+    return sym
+
+
+def row_to_atoms(table, row, layout="property", state=None, accounting=None):
     """
     Convert a database row into structured MeTTa atoms.
     Example:
       row = {"id": 1, "title": "Meeting"}
-      atoms -> 
+      atoms ->
         (:table 1)
         (:table.title 1 "Meeting")
+
+    Layouts (see SPACE LAYOUTS below):
+      "property": one atom per column keyed by the full ID (default)
+      "compact":  same shape, keyed by an integer surrogate ID
+      "row":      (:table 17 ("Meeting" ...)) - one expression per row
+
+    The "compact" and "row" layouts need the interpreter's space state
+    (see get_space_state) to hold the surrogate ID mapping. With
+    state["elide_empty"] (see set_elision), property atoms of null/empty
+    values are skipped and counted as savings in the state's accounting
+    (or in `accounting`, a state whose stats are merged later, e.g. a chunk's).
+    Columns with a text policy (see set_text_policies) are encoded by
+    encode_text, and a state["text_index"] (see text_index.py) and
+    state["aggregates"] (see aggregates.py) are fed the row's values.
     """
     atoms = []
     rid = row.get("id")
+    policies = state.get("text_policies", {}).get(table) if state is not None else None
+    index = state.get("text_index") if state is not None else None
+    if index is not None and rid is not None:
+        index.add_row(table, rid, row)
+    aggregates = state.get("aggregates") if state is not None else None
+    if aggregates is not None:
+        aggregates.add_row(table, rid, row)
+
+    if layout == "property":
+        key = encode_value(rid)
+    elif state is None:
+        raise ValueError(f"layout '{layout}' requires a space state")
+    else:
+        key = encode_value(None if rid is None else assign_surrogate_id(state, table, rid))
+        if layout == "row":
+            columns = state["columns"].setdefault(table, [c for c in row if c != "id"])
+            if policies:
+                values = " ".join(
+                    encode_text(state, table, c, row.get(c), policies[c]) if c in policies
+                    else encode_value(row.get(c))
+                    for c in columns)
+            else:
+                values = " ".join(encode_value(row.get(c)) for c in columns)
+            atoms.append(f"(:{table} {key} ({values}))")
+            return atoms
 
     if rid is not None:
-        atoms.append(f"(:{table} {encode_value(rid)})")
+        atoms.append(f"(:{table} {key})")
 
+    elide = state is not None and state.get("elide_empty")
     for col, val in row.items():
         if col != "id":
-            atoms.append(f"(:{table}.{col} {encode_value(rid)} {encode_value(val)})")
+            if policies and col in policies:
+                encoded = encode_text(state, table, col, val, policies[col])
+            else:
+                encoded = encode_value(val)
+            atom = f"({column_symbol(table, col)} {key} {encoded})"
+            if elide and is_empty_value(val):
+                record_elided(accounting or state, table, col, len(atom))
+                continue
+            atoms.append(atom)
 
     return atoms
 
 
+def is_empty_value(val):
+    """True for values elision skips: None, blank strings, empty JSON arrays/objects."""
+    if val is None:
+        return True
+    if isinstance(val, str):
+        return not val.strip()
+    if isinstance(val, (list, dict)):
+        return not val
+    return False
+
+
+# -------------------------------------------------------------
+# RESULT DECODING
+# -------------------------------------------------------------
+# Query helpers return hyperon atoms. These turn whole result sets into
+# Python values in one pass per column: the atom's own value first
+# (strings, numbers, booleans are grounded atoms), then a single caster
+# chosen from the column's data_type for values encode_value had to write
+# as text (numeric, dates, JSON). encode_value is lossy for text (control
+# and non-ASCII characters become spaces), so decoded strings are too.
+def _parse_json_text(text):
+    # encode_value writes dicts/lists as their Python repr
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return json.loads(text)
+
+
+_INT_TYPES = ("smallint", "integer", "bigint")
+_FLOAT_TYPES = ("real", "double precision")
+_CASTERS = {
+    "numeric": Decimal,
+    "date": date.fromisoformat,
+    "time without time zone": dtime.fromisoformat,
+    "timestamp without time zone": datetime.fromisoformat,
+    "timestamp with time zone": datetime.fromisoformat,
+    "json": _parse_json_text,
+    "jsonb": _parse_json_text,
+    **{t: int for t in _INT_TYPES},
+    **{t: float for t in _FLOAT_TYPES},
+}
+
+_column_type_cache = {}
+
+
+def column_types(table):
+    """Return {column: data_type} for a table (cached; one schema query per table)."""
+    types = _column_type_cache.get(table)
+    if types is None:
+        types = _column_type_cache[table] = {c[0]: c[1] for c in get_columns(table)}
+    return types
+
+
+def atom_value(atom):
+    """
+    Python value of one result atom: the grounded value, None for Null,
+    the name of other symbols, a list for expressions. Values that are
+    not atoms (e.g. resolved text, real IDs) are returned unchanged.
+    """
+    if atom is None or isinstance(atom, (str, int, float)):
+        return atom
+    kind = atom.get_metatype()
+    if kind == AtomKind.GROUNDED:
+        return atom.get_object().value
+    if kind == AtomKind.SYMBOL:
+        name = atom.get_name()
+        return None if name == "Null" else name
+    if kind == AtomKind.EXPR:
+        return [atom_value(child) for child in atom.get_children()]
+    return str(atom)
+
+
+def decode_column(atoms, data_type=None):
+    """
+    Decode a list of result atoms of one column into Python values, typed
+    by the column's information_schema data_type. Values that do not parse
+    as that type (e.g. truncated text) are kept as strings.
+    """
+    values = list(map(atom_value, atoms))
+    cast = _CASTERS.get(data_type) if data_type is not None else None
+    if cast is None:
+        return values
+
+    def convert(v):
+        if not isinstance(v, str):
+            return v
+        try:
+            return cast(v)
+        except (ValueError, SyntaxError, InvalidOperation):
+            return v
+
+    return list(map(convert, values))
+
+
+def _to_array(values, data_type):
+    """One decoded column as a numpy array (float with NaN for nullable numbers)."""
+    if np is None:
+        raise ImportError("as_numpy=True requires numpy (pip install numpy)")
+    has_null = any(v is None for v in values)
+    if data_type in _INT_TYPES and not has_null:
+        return np.array(values, dtype=np.int64)
+    if data_type in _INT_TYPES or data_type in _FLOAT_TYPES:
+        return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+    if data_type == "boolean" and not has_null:
+        return np.array(values, dtype=bool)
+    return np.array(values, dtype=object)
+
+
+def _decode(table, results, properties):
+    if properties is None:
+        properties = [k for k in results[0] if k != "id"] if results else []
+    names = ["id"] + [p for p in properties if p != "id"]
+    types = column_types(table)
+    columns = {name: decode_column([r.get(name) for r in results], types.get(name))
+               for name in names}
+    return columns, types
+
+
+def decode_results(table, results, properties=None):
+    """
+    Decode query_by_id / query_batch results into Python values.
+
+    Args:
+        table: Table the results come from (for the column data types)
+        results: List of result dicts
+        properties: Columns to decode (default: the keys of the first result)
+
+    Returns:
+        List of dicts, in the order of `results`
+    """
+    columns, _ = _decode(table, results, properties)
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+
+def decode_columns(table, results, properties=None, as_numpy=False):
+    """
+    Decode query_by_id / query_batch results column by column.
+
+    Args:
+        table: Table the results come from (for the column data types)
+        results: List of result dicts
+        properties: Columns to decode (default: the keys of the first result)
+        as_numpy: Return numpy arrays (requires numpy): int64/float64/bool
+                  where the data type allows, else object
+
+    Returns:
+        {column: values}, "id" first
+    """
+    columns, types = _decode(table, results, properties)
+    if as_numpy:
+        return {name: _to_array(values, types.get(name)) for name, values in columns.items()}
+    return columns
+
+
+# -------------------------------------------------------------
+# SPACE LAYOUTS
+# -------------------------------------------------------------
+# The layout state itself lives in space_state.py (no database access);
+# these helpers translate record IDs for the query functions below.
+def _id_key(interp, table, record_id):
+    """
+    Return the encoded key a record is stored under in the space, or None
+    if the record was never loaded (compact/row layouts only).
+    """
+    state = get_space_state(interp)
+    if state["layout"] == "property":
+        return encode_value(record_id)
+    sid = state["ids"].get(table, {}).get(record_id)
+    return None if sid is None else encode_value(sid)
+
+
+def _entity_query(interp):
+    """(pattern, result) matching a record's entity atom in the current layout."""
+    if get_space_state(interp)["layout"] == "row":
+        return "({entity} {id} $row)", "$row"
+    return "({entity} {id})", "$result"
+
+
+# -------------------------------------------------------------
+# PREPARED QUERIES
+# -------------------------------------------------------------
+# Query patterns are parsed once per interpreter and run through the
+# space's query API (space.subst) instead of building a program string
+# for interp.run on every call. Fields are whole tokens, e.g.
+# '({head} {id} $val)', bound per call from MeTTa literal text
+# (column_symbol(...), encode_value(...)); each distinct literal is
+# tokenized once and cached.
+_FIELD = re.compile(r"\{(\w+)\}")
+_FIELD_VAR = "_field_"
+
+# Per-interpreter caches: {"queries": {(pattern, result): PreparedQuery}, "literals": {text: Atom}}
+_prepared = InterpreterMap()
+LITERAL_CACHE_SIZE = 100000
+
+
+class PreparedQuery:
+    """
+    A `!(match &self pattern result)` query, parsed once.
+
+    Holds no reference to the interpreter, so it can be cached per
+    interpreter without keeping it alive.
+    """
+
+    def __init__(self, interp, pattern, result="$val"):
+        self.pattern = pattern
+        self.result_text = result
+        self.text = f"!(match {{space}} {pattern} {result})"
+        self.fields = sorted(set(_FIELD.findall(pattern)) | set(_FIELD.findall(result)))
+        self._tree = self._compile(interp.parse_single(_FIELD.sub(rf"${_FIELD_VAR}\1", pattern)))
+        self._result_tree = self._compile(interp.parse_single(_FIELD.sub(rf"${_FIELD_VAR}\1", result)))
+
+    def _compile(self, atom):
+        # Fields become ("field", name); subtrees without fields stay as parsed atoms
+        if isinstance(atom, VariableAtom) and atom.get_name().startswith(_FIELD_VAR):
+            return ("field", atom.get_name()[len(_FIELD_VAR):])
+        if isinstance(atom, ExpressionAtom):
+            children = [self._compile(c) for c in atom.get_children()]
+            if any(not hasattr(c, "catom") for c in children):
+                return children
+        return atom
+
+    def _build(self, node, args):
+        if isinstance(node, tuple):
+            return args[node[1]]
+        if isinstance(node, list):
+            return E(*[self._build(c, args) for c in node])
+        return node
+
+    def bind(self, interp, args):
+        """(pattern, result) atoms with every field bound to the literal in `args`."""
+        atoms = {f: _literal_atom(interp, args[f]) for f in self.fields}
+        return self._build(self._tree, atoms), self._build(self._result_tree, atoms)
+
+    def run(self, interp, args, space=None):
+        """
+        Matched result atoms (what interp.run would return in its single
+        result list), from `space` (default: the interpreter's &self).
+        """
+        if space is None:
+            space = interp.space()
+        return space.subst(*self.bind(interp, args))
+
+    def format(self, args, token="&self"):
+        """The equivalent program text, for the interp.run path."""
+        return (f"!(match {token} {self.pattern.format(**args)} "
+                f"{self.result_text.format(**args)})")
+
+
+def _interp_cache(interp):
+    cache = _prepared.get(interp)
+    if cache is None:
+        cache = _prepared[interp] = {"queries": {}, "literals": {}}
+    return cache
+
+
+def _literal_atom(interp, text):
+    literals = _interp_cache(interp)["literals"]
+    atom = literals.get(text)
+    if atom is None:
+        if len(literals) >= LITERAL_CACHE_SIZE:
+            literals.clear()
+        atom = literals[text] = interp.parse_single(text)
+    return atom
+
+
+def prepare_query(interp, pattern, result="$val"):
+    """
+    Return the cached PreparedQuery for `pattern` on this interpreter.
+
+    Args:
+        interp: MeTTa interpreter
+        pattern: MeTTa pattern with {field} tokens, e.g. '({head} {id} $val)'
+        result: Result template, e.g. '$val' (may use the same fields)
+
+    Example:
+        q = prepare_query(interp, "({head} {id} $val)")
+        q.run(interp, {"head": column_symbol("meetings", "title"), "id": encode_value(rid)})
+    """
+    queries = _interp_cache(interp)["queries"]
+    key = (pattern, result)
+    query = queries.get(key)
+    if query is None:
+        query = queries[key] = PreparedQuery(interp, pattern, result)
+    return query
+
+
+def _match(interp, table, pattern, result="$val", timeout_s=None, max_results=None, **args):
+    """
+    Result atoms of `!(match <space> pattern result)` with `args` bound,
+    run in the space holding `table` (see table_space).
+
+    Runs the prepared query unless query limits apply; those need the
+    step-wise runner, so the program text goes through _run_query instead.
+    """
+    query = prepare_query(interp, pattern, result)
+    token, space = table_space(interp, table)
+    if _query_limits is None and timeout_s is None and max_results is None:
+        if _instrumentation is None:
+            return query.run(interp, args, space)
+        return _timed("metta", query.text, query.run, interp, args, space,
+                      text=query.format(args, token))
+    results = _run_query(interp, query.format(args, token), query.text, timeout_s, max_results)
+    return results[0] if results else []
+
+
 # -------------------------------------------------------------
 # ATOM TYPE DISCOVERY
 # -------------------------------------------------------------
@@ -180,7 +1120,10 @@ def list_atom_types(interp=None, verify_existence=True):
     Args:
         interp: MeTTa interpreter (optional - only needed if verify_existence=True)
         verify_existence: If True, verify each type exists by querying a sample atom
-                          Requires interp to be provided
+                          Requires interp to be provided. Tables the loader
+                          accounted for are answered from its accounting;
+                          others sample one ID with LIMIT 1 and check all
+                          properties with prepared queries.
     """
     tables = get_tables()
     entity_types = []
@@ -202,34 +1145,19 @@ def list_atom_types(interp=None, verify_existence=True):
     if verify_existence and interp is not None:
         verified_entity_types = []
         verified_property_types = {}
+        stats = get_space_stats(interp)["tables"]
         
         for table in entity_types:
-            # Check if at least one entity of this type exists
-            sample_rows = fetch_table(table)[:1]
-            if sample_rows and sample_rows[0].get("id"):
-                sample_id = sample_rows[0]["id"]
-                encoded_id = encode_value(sample_id)
-                try:
-                    query = f'!(match &self (:{table} {encoded_id}) $result)'
-                    results = interp.run(query)
-                    if results and len(results) > 0:
-                        verified_entity_types.append(table)
-                        
-                        # Verify properties for this entity
-                        verified_props = []
-                        for prop in property_types[table][:5]:  # Check first 5 props only
-                            try:
-                                prop_query = f'!(match &self (:{table}.{prop} {encoded_id} $val) $val)'
-                                prop_results = interp.run(prop_query)
-                                if prop_results and len(prop_results) > 0:
-                                    verified_props.append(prop)
-                            except Exception:
-                                pass  # Skip properties that cause errors
-                        
-                        if verified_props:
-                            verified_property_types[table] = verified_props
-                except Exception:
-                    pass  # Skip tables that cause errors
+            if table in stats:
+                # Answer from the loader's accounting: no SQL, no MeTTa query
+                verified = _verify_from_stats(table, property_types[table], stats[table])
+            else:
+                verified = _verify_sample(interp, table, property_types[table])
+            if verified is None:
+                continue
+            verified_entity_types.append(table)
+            if verified:
+                verified_property_types[table] = verified
         
         result['verified_entity_types'] = verified_entity_types
         result['verified_property_types'] = verified_property_types
@@ -238,9 +1166,88 @@ def list_atom_types(interp=None, verify_existence=True):
     return result
 
 
+def _verify_from_stats(table, properties, table_stats):
+    """
+    Verify a table from load accounting. Returns the loaded properties,
+    or None if no row of the table was loaded.
+    """
+    if table_stats["rows"] == 0:
+        return None
+    loaded = table_stats["properties"]
+    if "row" in loaded:
+        return list(properties)  # the row expression holds every column
+    elided = table_stats.get("elided", {}).get("properties", {})
+    return [p for p in properties if loaded.get(p, {}).get("atoms", 0) > 0 or p in elided]
+
+
+def _verify_sample(interp, table, properties):
+    """
+    Verify a table against the space using one sample record.
+
+    Fetches a single ID with LIMIT 1 and checks the entity atom and every
+    property with prepared queries, so the cost is constant per table.
+    Returns the verified properties, or None if the entity could not be
+    found.
+    """
+    record_id = sample_id(table)
+    if record_id is None:
+        return None
+    encoded_id = _id_key(interp, table, record_id)
+    if encoded_id is None:
+        return None
+
+    row_layout = get_space_state(interp)["layout"] == "row"
+    pattern, result = _entity_query(interp)
+    try:
+        if not _match(interp, table, pattern, result, entity=f":{table}", id=encoded_id):
+            return None
+        if row_layout:
+            # The row expression holds every loaded column at once
+            loaded_cols = get_space_state(interp)["columns"].get(table, [])
+            return [p for p in properties if p in loaded_cols]
+        return [prop for prop in properties
+                if _match(interp, table, "({head} {id} $val)",
+                          head=column_symbol(table, prop), id=encoded_id)]
+    except Exception:
+        return None  # Skip tables that cause errors
+
+
+def format_bytes(n):
+    """Format a byte count for display (e.g. 1.5 MB)."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+def print_space_stats(interp):
+    """
+    Print the loader's accounting: atoms and estimated bytes per table and
+    per property. Does not call get_atoms()/atom_count().
+    """
+    stats = get_space_stats(interp)
+    if not stats["tables"]:
+        print("No load accounting recorded for this space.")
+        return
+
+    print(f"Space size (from loader accounting): {stats['atoms']} atoms, "
+          f"{stats['rows']} rows, ~{format_bytes(stats['bytes'])}")
+    for table, ts in sorted(stats["tables"].items(), key=lambda kv: -kv[1]["bytes"]):
+        print(f"  • :{table}: {ts['atoms']} atoms, {ts['rows']} rows, ~{format_bytes(ts['bytes'])}")
+        top = sorted(ts["properties"].items(), key=lambda kv: -kv[1]["bytes"])[:5]
+        if top:
+            print("    Largest properties: " + ", ".join(
+                f"{p} ({ps['atoms']} atoms, ~{format_bytes(ps['bytes'])})" for p, ps in top))
+        elided = ts.get("elided", {})
+        if elided.get("atoms"):
+            print(f"    Elided null/empty values: {elided['atoms']} atoms, "
+                  f"~{format_bytes(elided['bytes'])} saved")
+
+
 def print_atom_types(interp, verify_existence=True):
     """
-    Print a human-readable list of atom types.
+    Print a human-readable list of atom types, followed by the loader's
+    accounting of the space size when data has been loaded.
     """
     types = list_atom_types(interp, verify_existence)
     
@@ -269,11 +1276,15 @@ def print_atom_types(interp, verify_existence=True):
         print()
         print("Note: Types listed from schema. Use verify_existence=True to check MeTTa space.")
 
+    if interp is not None and get_space_stats(interp)["tables"]:
+        print()
+        print_space_stats(interp)
+
 
 # -------------------------------------------------------------
 # PRODUCTION QUERY HELPERS
 # -------------------------------------------------------------
-def query_by_id(interp, table, record_id, properties=None):
+def query_by_id(interp, table, record_id, properties=None, resolve_refs=True, decode=False):
     """
     Production-safe: Query a specific record by ID.
     
@@ -282,39 +1293,70 @@ def query_by_id(interp, table, record_id, properties=None):
         table: Table name
         record_id: Record ID to query
         properties: Optional list of property names to extract
+        resolve_refs: Fetch the full text of "ref"/"blob" policy columns
+                      (see set_text_policies); False returns the reference
+        decode: Return Python values typed by the schema instead of atoms
+                (see decode_results)
+    
+    Works over every layout: compact/row surrogate IDs are resolved through
+    the interpreter's space state, so callers always pass the real ID.
     
     Returns:
         dict with 'id' and requested properties
     """
-    encoded_id = encode_value(record_id)
+    encoded_id = _id_key(interp, table, record_id)
+    if encoded_id is None:
+        return None
     result = {"id": record_id}
     
     # Check if record exists
     try:
-        query = f'!(match &self (:{table} {encoded_id}) $result)'
-        exists = interp.run(query)
-        if not exists or len(exists) == 0:
+        pattern, result_var = _entity_query(interp)
+        exists = _match(interp, table, pattern, result_var, entity=f":{table}", id=encoded_id)
+        if not exists:
             return None
+    except QueryLimitExceeded:
+        raise
     except Exception:
         return None
     
+    # Row layout: every column comes back in the single row expression
+    state = get_space_state(interp)
+    external = [c for c, (mode, _) in state.get("text_policies", {}).get(table, {}).items()
+                if mode in ("ref", "blob")] if resolve_refs else []
+    if state["layout"] == "row":
+        row_atom = exists[0]
+        if properties:
+            children = row_atom.get_children() if isinstance(row_atom, ExpressionAtom) else []
+            values = dict(zip(state["columns"].get(table, []), children))
+            for prop in properties:
+                # Unknown columns come back as None, as in the property layout
+                value = values.get(prop)
+                if value is not None and prop in external:
+                    value = resolve_text(interp, table, record_id, prop, value)
+                result[prop] = value
+        return decode_results(table, [result], properties)[0] if decode else result
+    
     # Extract properties if requested
     if properties:
         for prop in properties:
             try:
-                query = f'!(match &self (:{table}.{prop} {encoded_id} $val) $val)'
-                prop_results = interp.run(query)
-                if prop_results and len(prop_results) > 0:
-                    result[prop] = extract_query_value(prop_results)
+                prop_results = _match(interp, table, "({head} {id} $val)",
+                                      head=column_symbol(table, prop), id=encoded_id)
+                result[prop] = prop_results[0] if prop_results else None
+                if prop in external and prop_results:
+                    result[prop] = resolve_text(interp, table, record_id, prop, prop_results[0])
             except KeyboardInterrupt:
                 # User interrupted, stop processing
                 break
+            except QueryLimitExceeded:
+                raise
             except Exception:
                 # Property query failed (may cause panic with some properties)
                 # Set to None and continue with other properties
                 result[prop] = None
     
-    return result
+    return decode_results(table, [result], properties)[0] if decode else result
 
 
 def query_batch(interp, table, record_ids, properties=None, batch_size=50):
@@ -341,7 +1383,18 @@ def query_batch(interp, table, record_ids, properties=None, batch_size=50):
     return results
 
 
-def query_by_property_value(interp, table, property_name, value):
+def query_batch_decoded(interp, table, record_ids, properties=None, batch_size=50):
+    """
+    query_batch with Python values typed by the schema instead of atoms,
+    decoded column by column over the whole result set (see decode_results).
+    For {column: values} use decode_columns on query_batch's results.
+    """
+    return decode_results(table, query_batch(interp, table, record_ids, properties, batch_size),
+                          properties)
+
+
+def query_by_property_value(interp, table, property_name, value,
+                            max_results=None, timeout_s=None):
     """
     Production-safe: Find IDs by property value (use for small result sets).
     
@@ -352,54 +1405,194 @@ def query_by_property_value(interp, table, property_name, value):
         table: Table name
         property_name: Property to search
         value: Value to match
+        max_results: Abort with ResultLimitExceeded past this many matches
+                     (default: set_query_limits)
+        timeout_s: Abort with QueryTimeout after this many seconds
+                   (default: set_query_limits)
     
     Returns:
-        List of matching record IDs
+        List of matching record IDs (Python values, in every layout)
     """
     encoded_value = encode_value(value)
+    state = get_space_state(interp)
     try:
         # Query: find all records where property = value
-        query = f'!(match &self (:{table}.{property_name} $id {encoded_value}) $id)'
-        results = interp.run(query)
-        
-        if not results:
-            return []
-        
-        # Extract IDs from results
-        ids = []
-        for result in results:
-            if isinstance(result, list) and len(result) > 0:
-                id_val = extract_query_value([result])
-                if id_val:
-                    ids.append(id_val)
+        if state["layout"] == "row":
+            columns = state["columns"].get(table, [])
+            if property_name not in columns:
+                return []
+            values = " ".join("{value}" if c == property_name else f"$c{i}"
+                              for i, c in enumerate(columns))
+            matches = _match(interp, table, f"({{head}} $id ({values}))", "$id", timeout_s, max_results,
+                             head=f":{table}", value=encoded_value)
+        else:
+            matches = _match(interp, table, "({head} $id {value})", "$id", timeout_s, max_results,
+                             head=column_symbol(table, property_name), value=encoded_value)
         
-        return ids
+        # Decode every matched ID atom in one pass (surrogates map back to record IDs)
+        keys = list(map(atom_value, matches))
+        if state["layout"] == "property":
+            return [k for k in keys if k is not None]
+        record_ids = state["record_ids"].get(table, [])
+        return [record_ids[k] for k in keys if isinstance(k, int) and 0 <= k < len(record_ids)]
+    except QueryLimitExceeded:
+        raise
     except Exception as e:
         print(f"Query failed: {e}")
         return []
 
 
+def query_all_matching(interp, table, properties=None, where=None, params=(),
+                       page_size=1000, batch_size=50, prefetch=True, stats=None):
+    """
+    Production-safe: Query every record matching an SQL condition, page by page.
+
+    The hybrid pattern for jobs that must see every matching ID rather than
+    the first LIMIT n: SQL selects IDs in keyset pages (see iter_id_pages),
+    each page goes through query_batch while the next page is prefetched.
+
+    Args:
+        interp: MeTTa interpreter
+        table: Table name
+        properties: Optional list of property names
+        where: Optional SQL condition, e.g. "status = %s"
+        params: Parameters for `where`
+        page_size: IDs per SQL page (default 1000)
+        batch_size: Passed to query_batch (default 50)
+        prefetch: Fetch the next page while the current one is queried
+        stats: Optional dict, filled with pages, ids, results, seconds and ids_per_s
+
+    Yields:
+        Result dicts, in ascending ID order
+    """
+    if stats is None:
+        stats = {}
+    stats.update(pages=0, ids=0, results=0, seconds=0.0, ids_per_s=0.0)
+    start = time.perf_counter()
+    try:
+        for page in iter_id_pages(table, page_size, where, params, prefetch):
+            stats["pages"] += 1
+            stats["ids"] += len(page)
+            for result in query_batch(interp, table, page, properties, batch_size):
+                stats["results"] += 1
+                yield result
+    finally:
+        stats["seconds"] = time.perf_counter() - start
+        stats["ids_per_s"] = stats["ids"] / stats["seconds"] if stats["seconds"] else 0.0
+
+
 # -------------------------------------------------------------
 # LOAD DATA INTO METTA
 # -------------------------------------------------------------
-def load_all(interp):
-    tables = get_tables()
+def load_all(interp, layout=None, partitions=None, tables=None, elide_empty=None,
+             text_policies=None, text_index=None, aggregates=None,
+             columnar_dir=None, columnar_format="arrow"):
+    """
+    Load every table into the interpreter's space.
+
+    Args:
+        interp: MeTTa interpreter
+        layout: Optional atom layout ("property", "compact" or "row"),
+                see SPACE LAYOUTS. Defaults to the interpreter's current
+                layout ("property" unless set_layout was called).
+        partitions: Optional "table" or {table: group} to load tables into
+                    their own named spaces (see set_partitions); the query
+                    helpers route to them automatically.
+        tables: Optional list of tables to load (default: all public tables,
+                or the row store's tables when one is set, see set_row_store)
+        elide_empty: Skip atoms of null/empty values (see set_elision);
+                     the savings are reported by print_space_stats
+        text_policies: Optional {table: {column: spec}} for long text
+                       columns (see set_text_policies)
+        text_index: Optional {table: [column, ...]} to build a search index
+                    over (see text_index.search_text)
+        aggregates: Optional {table: [column, ...]} to count values of,
+                    added as (:count ...) atoms (see aggregates.py)
+        columnar_dir: Also write the loaded rows to <columnar_dir>/<table>.arrow
+                      (or .parquet, see columnar_format) for analytics jobs;
+                      requires pyarrow (see columnar_export.py)
+    """
+    state = set_layout(interp, layout) if layout else get_space_state(interp)
+    if partitions is not None:
+        set_partitions(interp, partitions)
+    if elide_empty is not None:
+        set_elision(interp, elide_empty)
+    if text_policies is not None:
+        set_text_policies(interp, text_policies)
+    if text_index is not None:
+        set_text_index(interp, text_index)
+    if aggregates is not None:
+        set_aggregates(interp, aggregates)
+    if tables is None:
+        tables = _row_store.tables() if _row_store is not None else get_tables()
+    if columnar_dir is not None:
+        from columnar_export import write_rows
     total_atoms = 0
 
     for t in tables:
         rows = fetch_table(t)
-        print(f"Loading table: {t} ({len(rows)} rows)")
+        if columnar_dir is not None:
+            write_rows(t, rows, columnar_dir, columnar_format)
+        token, _ = table_space(interp, t)
+        print(f"Loading table: {t} ({len(rows)} rows)" + ("" if token == "&self" else f" into {token}"))
 
         for row in rows:
-            atoms = row_to_atoms(t, row)
+            atoms = _timed("encode", "row_to_atoms", row_to_atoms, t, row, state["layout"], state)
             for atom_str in atoms:
                 # Insert directly into MeTTa space
-                interp.run(f"!(add-atom &self {atom_str})")
+                _run(interp, f"!(add-atom {token} {atom_str})", "!(add-atom {space} {atom})")
                 total_atoms += 1
+            record_row(state, t, atoms)
 
+    refresh_aggregate_atoms(interp)
     print(f"\n✓ Loaded {total_atoms} atoms into MeTTa\n")
 
 
+def remove_record(interp, table, record_id, columns=None):
+    """
+    Remove every atom of one record from the space holding its table,
+    and take it out of the load accounting, the text index and the
+    aggregate counts (their summary atoms are rewritten by
+    refresh_aggregate_atoms).
+
+    Args:
+        interp: MeTTa interpreter
+        table: Table name
+        record_id: Record ID
+        columns: The table's property columns (default: from get_columns);
+                 pass them when removing many records
+
+    Returns:
+        Number of atoms removed
+    """
+    state = get_space_state(interp)
+    key = _id_key(interp, table, record_id)
+    if key is None:
+        return 0
+    _, space = table_space(interp, table)
+
+    pattern, _ = _entity_query(interp)
+    atoms = _match(interp, table, pattern, pattern, entity=f":{table}", id=key)
+    if state["layout"] != "row":
+        if columns is None:
+            columns = [c[0] for c in get_columns(table) if c[0] != "id"]
+        for col in columns:
+            atoms += _match(interp, table, "({head} {id} $val)", "({head} {id} $val)",
+                            head=column_symbol(table, col), id=key)
+
+    for atom in atoms:
+        space.remove_atom(atom)
+    if atoms:
+        record_row(state, table, [str(a) for a in atoms], sign=-1)
+    if state["layout"] != "property":
+        state["ids"].get(table, {}).pop(record_id, None)
+    if state.get("text_index") is not None:
+        state["text_index"].remove(table, record_id)
+    if state.get("aggregates") is not None:
+        state["aggregates"].remove(table, record_id)
+    return len(atoms)
+
+
 # -------------------------------------------------------------
 # MAIN
 # -------------------------------------------------------------
@@ -429,8 +1622,8 @@ if __name__ == "__main__":
         # Get a sample ID from the database to test with a specific query
         sample_rows = fetch_table(first)[:1]
         if sample_rows and sample_rows[0].get("id"):
-            sample_id = sample_rows[0]["id"]
-            encoded_id = encode_value(sample_id)
+            sample_row_id = sample_rows[0]["id"]
+            encoded_id = encode_value(sample_row_id)
             
             # Query 1: Test exact match (confirms atom exists)
             print(f"\nQuery 1: Testing exact match for ID from '{first}'")
@@ -449,7 +1642,7 @@ if __name__ == "__main__":
                 print(f"  ✗ Error: {e}")
             
             # Query 2: Extract multiple property values (shows actual data extraction)
-            print(f"\nQuery 2: Extracting property values for ID: {sample_id}")
+            print(f"\nQuery 2: Extracting property values for ID: {sample_row_id}")
             # Get property column names (skip 'id', limit to first 3 to avoid panics)
             # Note: Some property queries may cause Rust panics that can't be caught
             cols = [c[0] for c in get_columns(first) if c[0] != 'id'][:3]
@@ -512,10 +1705,10 @@ if __name__ == "__main__":
         sample_rows = fetch_table(first)[:1]
         
         if sample_rows and sample_rows[0].get("id"):
-            sample_id = sample_rows[0]["id"]
+            sample_row_id = sample_rows[0]["id"]
             
             print("Example 1: Query by specific ID (production-safe)")
-            result = query_by_id(interp, first, sample_id, ["text", "assignee"])
+            result = query_by_id(interp, first, sample_row_id, ["text", "assignee"])
             if result:
                 print(f"  Found record: {result.get('id')}")
                 for key, val in result.items():
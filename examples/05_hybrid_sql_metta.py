@@ -10,7 +10,7 @@ This is the best approach for production use.
 """
 
 from hyperon import MeTTa
-from connect import load_all, query_batch, cursor
+from connect import load_all, query_batch, query_all_matching, cursor
 
 def main():
     print("=" * 60)
@@ -28,12 +28,13 @@ def main():
     
     # Step 1: Use SQL to filter/limit (fast, handles large datasets)
     print("Step 1: Using SQL to filter records...")
-    print("  Query: SELECT id FROM action_items WHERE status = 'active' LIMIT 10")
+    print("  Query: SELECT id FROM action_items WHERE status = 'active' ORDER BY id LIMIT 10")
     
     try:
         cursor.execute("""
             SELECT id FROM action_items 
             WHERE status = 'active'
+            ORDER BY id
             LIMIT 10
         """)
         filtered_ids = [row[0] for row in cursor.fetchall()]
@@ -63,6 +64,15 @@ def main():
                 print(f"  {i}. [{result.get('status', 'N/A')}] {result.get('assignee', 'N/A')}: {text}")
         else:
             print("  No records found matching criteria")
+        
+        # Step 4: Walk every matching ID (keyset pages, next page prefetched)
+        print("\nStep 4: Processing all active records page by page...")
+        stats = {}
+        total = sum(1 for _ in query_all_matching(
+            interp, "action_items", ["status"],
+            where="status = %s", params=("active",), page_size=1000, stats=stats))
+        print(f"  ✓ {total} records in {stats['pages']} pages "
+              f"({stats['ids_per_s']:,.0f} IDs/s)")
             
     except Exception as e:
         print(f"  Error: {e}")
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Export database tables as MeTTa source files for offline bulk import.
+
+The export runs as a batch job against the database and writes each table's
+atoms (the `row_to_atoms` output) into sharded `.metta` files, optionally
+gzip-compressed, plus a `manifest.json` describing the shards.
+
+Serving processes then call `load_metta_files(interp, directory)`, which
+needs no database access: each shard is handed to the interpreter as one
+program, so it is parsed once instead of once per atom.
+
+Compact layouts ("compact", "row") store integer surrogate IDs in the
+shards; the ID mapping is written next to them as `<table>.ids.json` and
+restored by the loader, so `query_by_id` keeps working on real IDs.
+
+Usage:
+    python export_metta.py OUT_DIR [--rows-per-shard N] [--gzip]
+                           [--layout property|compact|row] [--tables t1 t2 ...]
+                           [--elide-empty] [--text-policy table.column=policy ...]
+                           [--text-index table.column ...] [--aggregate table.column ...]
+"""
+
+import argparse
+import gzip
+import io
+import json
+import os
+import time
+
+from space_state import (
+    LAYOUTS,
+    attach_space_state,
+    close_blob_files,
+    get_space_state,
+    keep_blob_files,
+    merge_stats,
+    new_space_state,
+    parse_text_policies,
+    record_row,
+    set_partitions,
+    table_space,
+)
+
+from aggregates import Aggregates
+from text_index import INDEX_NAME, TextIndex
+
+MANIFEST_NAME = "manifest.json"
+
+
+# -------------------------------------------------------------
+# SHARD FILES
+# -------------------------------------------------------------
+def shard_filename(table, index, compress=False):
+    """Return the file name of shard `index` of `table`."""
+    name = f"{table}.{index:05d}.metta"
+    return name + ".gz" if compress else name
+
+
+def open_shard(path, mode):
+    """Open a shard for text reading/writing, gzip-compressed if it ends in .gz."""
+    if path.endswith(".gz"):
+        return io.TextIOWrapper(gzip.GzipFile(path, mode + "b"), encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def read_manifest(directory):
+    """Read the manifest written by `export_all`."""
+    with open(os.path.join(directory, MANIFEST_NAME), encoding="utf-8") as f:
+        return json.load(f)
+
+
+# -------------------------------------------------------------
+# EXPORT (needs database access)
+# -------------------------------------------------------------
+def export_table(table, out_dir, rows_per_shard=10000, compress=False, state=None):
+    """
+    Write one table's atoms to sharded MeTTa files.
+
+    Args:
+        table: Table name
+        out_dir: Directory the shards are written to
+        rows_per_shard: Maximum number of rows per shard file (default 10000)
+        compress: If True, shards are written gzip-compressed (.metta.gz)
+        state: Optional space state (connect.new_space_state) selecting the
+               layout and collecting surrogate IDs (default: property layout)
+
+    Returns:
+        List of shard entries: {"file", "rows", "atoms"}
+    """
+    # Imported here so that loading shards never opens a database connection
+    from connect import iter_table, row_to_atoms
+
+    if state is None:
+        state = new_space_state()
+
+    shards = []
+    out = None
+
+    for row in iter_table(table):
+        if out is None or shards[-1]["rows"] >= rows_per_shard:
+            if out is not None:
+                out.close()
+            shards.append({
+                "file": shard_filename(table, len(shards), compress),
+                "rows": 0,
+                "atoms": 0,
+            })
+            out = open_shard(os.path.join(out_dir, shards[-1]["file"]), "w")
+            out.write(f"; table: {table} shard: {len(shards) - 1}\n")
+        entry = shards[-1]
+
+        atoms = row_to_atoms(table, row, state["layout"], state)
+        out.write("\n".join(atoms))
+        out.write("\n")
+        entry["rows"] += 1
+        entry["atoms"] += len(atoms)
+        record_row(state, table, atoms)
+
+    if out is not None:
+        out.close()
+    return shards
+
+
+def _write_summary_shard(table, out_dir, compress, aggregates):
+    """Write a table's (:count ...) atoms as an extra shard; returns its entry."""
+    name = f"{table}.aggregates.metta" + (".gz" if compress else "")
+    atoms = aggregates.summary_atoms(table)
+    with open_shard(os.path.join(out_dir, name), "w") as out:
+        out.write(f"; table: {table} aggregates\n")
+        out.write("\n".join(atoms))
+        out.write("\n")
+    return {"file": name, "rows": 0, "atoms": len(atoms)}
+
+
+def export_all(out_dir, tables=None, rows_per_shard=10000, compress=False,
+               layout="property", elide_empty=False, text_policies=None, text_index=None,
+               aggregates=None):
+    """
+    Export every table (or the given subset) and write the manifest.
+
+    Args:
+        out_dir: Output directory (created if missing)
+        tables: Optional list of table names (default: all public tables)
+        rows_per_shard: Maximum number of rows per shard file
+        compress: If True, shards are gzip-compressed
+        layout: Atom layout ("property", "compact" or "row")
+        elide_empty: Skip atoms of null/empty values (see set_elision)
+        text_policies: Optional {table: {column: spec}} (see set_text_policies);
+                       "blob" files are written into `out_dir`
+        text_index: Optional {table: [column, ...]} to build a search index
+                    over; saved as text_index.json (see text_index.py)
+        aggregates: Optional {table: [column, ...]} to count values of; the
+                    (:count ...) atoms go into one extra shard per table
+
+    Returns:
+        The manifest dict that was written to `out_dir/manifest.json`
+    """
+    from connect import get_tables
+
+    os.makedirs(out_dir, exist_ok=True)
+    if tables is None:
+        tables = get_tables()
+
+    state = new_space_state(layout)
+    state["elide_empty"] = elide_empty
+    state["text_policies"] = parse_text_policies(text_policies)
+    state["blob_dir"] = out_dir
+    if text_index:
+        state["text_index"] = TextIndex(text_index)
+    if aggregates:
+        state["aggregates"] = Aggregates(aggregates)
+    manifest = {
+        "format": 1,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "layout": layout,
+        "elide_empty": elide_empty,
+        "text_policies": text_policies or {},
+        "tables": {},
+    }
+
+    for t in tables:
+        start = time.perf_counter()
+        shards = export_table(t, out_dir, rows_per_shard, compress, state)
+        if aggregates and t in aggregates:
+            shards.append(_write_summary_shard(t, out_dir, compress, state["aggregates"]))
+        rows = sum(s["rows"] for s in shards)
+        atoms = sum(s["atoms"] for s in shards)
+        manifest["tables"][t] = {
+            "rows": rows,
+            "atoms": atoms,
+            "stats": state["stats"].get(t, {}),
+            "shards": shards,
+        }
+        if layout != "property":
+            ids_file = f"{t}.ids.json"
+            with open(os.path.join(out_dir, ids_file), "w", encoding="utf-8") as f:
+                json.dump(state["record_ids"].get(t, []), f, default=str)
+            manifest["tables"][t]["ids_file"] = ids_file
+            if layout == "row":
+                manifest["tables"][t]["columns"] = state["columns"].get(t, [])
+        print(f"Exported table: {t} ({rows} rows, {atoms} atoms, "
+              f"{len(shards)} shards, {time.perf_counter() - start:.1f}s)")
+
+    close_blob_files(state)
+    if text_index:
+        state["text_index"].save(os.path.join(out_dir, INDEX_NAME))
+        manifest["text_index"] = INDEX_NAME
+    if aggregates:
+        manifest["aggregates"] = {"columns": aggregates,
+                                  "counts": state["aggregates"].to_json()}
+
+    # Write the manifest last: a directory without one is an incomplete export
+    tmp_path = os.path.join(out_dir, MANIFEST_NAME + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(out_dir, MANIFEST_NAME))
+
+    return manifest
+
+
+# -------------------------------------------------------------
+# LOAD (no database access)
+# -------------------------------------------------------------
+def load_metta_text(interp, text, space=None):
+    """
+    Load MeTTa source (atoms only, no `!` expressions) into a space.
+
+    By default the text is run as a single MeTTa program: every top-level
+    expression is added to &self. With `space` (a partition, see
+    table_space) the text is parsed once and its atoms are added to that
+    space instead.
+    """
+    if space is None:
+        interp.run(text)
+    else:
+        for atom in interp.parse_all(text):
+            space.add_atom(atom)
+
+
+def load_metta_file(interp, path, space=None):
+    """Load one shard into the interpreter's space (see load_metta_text)."""
+    with open_shard(path, "r") as f:
+        load_metta_text(interp, f.read(), space)
+
+
+def load_metta_files(interp, directory, tables=None, partitions=None):
+    """
+    Load an export produced by `export_all` into a MeTTa interpreter.
+
+    For compact layouts the surrogate ID mapping is restored into the
+    interpreter's space state (kept in Python, no database access needed).
+    The export's accounting is merged into the state as well, so
+    get_space_stats reports the loaded size.
+
+    Args:
+        interp: MeTTa interpreter
+        directory: Export directory containing manifest.json
+        tables: Optional list of table names to load (default: all exported)
+        partitions: Optional "table" or {table: group} to load tables into
+                    their own named spaces (see set_partitions)
+
+    Returns:
+        Total number of atoms loaded
+    """
+    if partitions is not None:
+        set_partitions(interp, partitions)
+    manifest = read_manifest(directory)
+    layout = manifest.get("layout", "property")
+    if layout != "property":
+        state = attach_space_state(interp, new_space_state(layout))
+    else:
+        state = get_space_state(interp)
+    state["elide_empty"] = manifest.get("elide_empty", False)
+    # Blob files sit next to the shards; "ref" columns are fetched from the database
+    state["text_policies"] = parse_text_policies(manifest.get("text_policies"))
+    state["blob_dir"] = directory
+    keep_blob_files(state)
+    if manifest.get("text_index"):
+        state["text_index"] = TextIndex.load(os.path.join(directory, manifest["text_index"]))
+    if manifest.get("aggregates"):
+        # Their (:count ...) atoms are loaded with the tables' shards
+        state["aggregates"] = Aggregates.from_json(manifest["aggregates"]["columns"],
+                                                   manifest["aggregates"]["counts"])
+    total_atoms = 0
+
+    for t, info in manifest["tables"].items():
+        if tables is not None and t not in tables:
+            continue
+        print(f"Loading table: {t} ({info['rows']} rows, {len(info['shards'])} shards)")
+        if layout != "property":
+            with open(os.path.join(directory, info["ids_file"]), encoding="utf-8") as f:
+                record_ids = json.load(f)
+            state["record_ids"][t] = record_ids
+            state["ids"][t] = {rid: sid for sid, rid in enumerate(record_ids)}
+            if "columns" in info:
+                state["columns"][t] = info["columns"]
+        token, space = table_space(interp, t)
+        for shard in info["shards"]:
+            load_metta_file(interp, os.path.join(directory, shard["file"]),
+                            None if token == "&self" else space)
+            total_atoms += shard["atoms"]
+        merge_stats(state, t, info.get("stats", {}))
+
+    print(f"\n✓ Loaded {total_atoms} atoms into MeTTa\n")
+    return total_atoms
+
+
+# -------------------------------------------------------------
+# MAIN
+# -------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Export tables as MeTTa source files")
+    parser.add_argument("out_dir", help="Directory to write shards and manifest.json to")
+    parser.add_argument("--rows-per-shard", type=int, default=10000)
+    parser.add_argument("--gzip", action="store_true", help="Compress shards with gzip")
+    parser.add_argument("--layout", default="property", choices=LAYOUTS)
+    parser.add_argument("--tables", nargs="*", help="Only export these tables")
+    parser.add_argument("--elide-empty", action="store_true",
+                        help="Skip atoms of null and empty values")
+    parser.add_argument("--text-policy", action="append", default=[],
+                        help="table.column=policy, e.g. meetings.transcript=blob or "
+                             "meetings.notes=truncate:200 (repeatable)")
+    parser.add_argument("--text-index", action="append", default=[],
+                        help="table.column to build the search index over (repeatable)")
+    parser.add_argument("--aggregate", action="append", default=[],
+                        help="table.column to count values of (repeatable)")
+    args = parser.parse_args()
+
+    aggregates = {}
+    for spec in args.aggregate:
+        table, _, column = spec.partition(".")
+        aggregates.setdefault(table, []).append(column)
+    text_index = {}
+    for spec in args.text_index:
+        table, _, column = spec.partition(".")
+        text_index.setdefault(table, []).append(column)
+    text_policies = {}
+    for spec in args.text_policy:
+        column, _, policy = spec.partition("=")
+        table, _, column = column.partition(".")
+        text_policies.setdefault(table, {})[column] = policy
+
+    print("=" * 60)
+    print("MeTTa Export")
+    print("=" * 60)
+    manifest = export_all(args.out_dir, args.tables, args.rows_per_shard, args.gzip,
+                          args.layout, args.elide_empty, text_policies, text_index,
+                          aggregates)
+    total = sum(t["atoms"] for t in manifest["tables"].values())
+    print(f"\n✓ Exported {total} atoms to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,29 @@
 #!/usr/bin/env python3
 """
 Script to find and list documenters from the database using SQL.
+
+Usage:
+    python list_documenters.py [--execute] [--analyze]
+
+--execute runs the generated queries and reports wall time, rows and plan
+cost per query; --analyze uses EXPLAIN (ANALYZE, BUFFERS) and suggests
+candidate indexes for slow DISTINCT / ORDER BY queries.
 """
 
-from connect import cursor, get_tables, get_columns
+import argparse
+
+from query_profiler import profile_queries, print_profile_report
+from role_discovery import discover_roles, format_estimate
+
+ROLE_KEYWORD = 'documenter'
 
 def find_documenter_tables():
-    """Find tables and columns related to documenters."""
-    tables = get_tables()
-    documenter_info = []
-    
+    """
+    Find tables and columns related to documenters.
+    Uses one catalog query (see role_discovery.discover_roles).
+    """
     print("Searching for documenter-related tables and columns...\n")
-    
-    for table in tables:
-        # Check if table name contains documenter
-        if 'documenter' in table.lower():
-            documenter_info.append({
-                'table': table,
-                'type': 'table_name',
-                'columns': [col[0] for col in get_columns(table)]
-            })
-        
-        # Check columns for documenter references
-        columns = get_columns(table)
-        documenter_cols = [col[0] for col in columns if 'documenter' in col[0].lower()]
-        
-        if documenter_cols:
-            documenter_info.append({
-                'table': table,
-                'type': 'column',
-                'columns': documenter_cols
-            })
-    
-    return documenter_info
+    return discover_roles([ROLE_KEYWORD])[ROLE_KEYWORD]
 
 def generate_sql_queries(documenter_info):
     """Generate SQL queries based on discovered documenter data."""
@@ -74,7 +65,7 @@ SELECT COUNT(DISTINCT documenter) FROM meetings;
         cols = info['columns']
         
         if info['type'] == 'table_name':
-            print(f"\n✓ Table: {table}")
+            print(f"\n✓ Table: {table} (rows: {format_estimate(info.get('estimated_rows'))})")
             print(f"  Columns: {', '.join(cols)}")
             
             queries.append({
@@ -95,7 +86,7 @@ SELECT COUNT(DISTINCT documenter) FROM meetings;
                 })
         
         elif info['type'] == 'column':
-            print(f"\n✓ Table: {table}")
+            print(f"\n✓ Table: {table} (rows: {format_estimate(info.get('estimated_rows'))})")
             print(f"  Documenter columns: {', '.join(cols)}")
             
             for col in cols:
@@ -117,6 +108,13 @@ SELECT COUNT(DISTINCT documenter) FROM meetings;
     return queries
 
 def main():
+    parser = argparse.ArgumentParser(description="Documenter SQL Query Generator")
+    parser.add_argument("--execute", action="store_true",
+                        help="Run the generated queries and report time, rows and plan cost")
+    parser.add_argument("--analyze", action="store_true",
+                        help="Profile with EXPLAIN (ANALYZE, BUFFERS) (implies --execute)")
+    args = parser.parse_args()
+
     print("=" * 60)
     print("Documenter SQL Query Generator")
     print("=" * 60)
@@ -160,6 +158,10 @@ def main():
                 
                 print(f"\n-- List all records with documenter info:")
                 print(f"SELECT * FROM {table} WHERE {col} IS NOT NULL ORDER BY {col};")
+        
+        if args.execute or args.analyze:
+            print()
+            print_profile_report(profile_queries(queries, analyze=args.analyze))
     
     print("\n" + "=" * 60)
     print("Tips:")
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Execute and profile SQL queries: wall time, rows, plan cost, buffers.
+
+Profiles either the queries generated by list_documenters.py /
+list_facilitators.py (see their --execute flag) or the statements in a
+.sql file such as documenter_queries.sql. With --analyze the plan comes
+from EXPLAIN (ANALYZE, BUFFERS) and includes actual times and buffer
+usage. Slow DISTINCT / ORDER BY / GROUP BY / filter patterns get
+candidate index suggestions.
+
+Every query runs in its own transaction that is rolled back afterwards,
+with a statement timeout, so profiling never leaves changes behind.
+
+Usage:
+    python query_profiler.py documenter_queries.sql [--analyze] [--timeout-ms 30000]
+"""
+
+import argparse
+import json
+import re
+import time
+
+import psycopg2
+
+from connect import conn, cursor
+
+# Plan nodes slower than this (ms, or cost units without ANALYZE) get index suggestions
+SLOW_NODE_MS = 100
+SLOW_NODE_COST = 10000
+
+
+# -------------------------------------------------------------
+# SQL FILES
+# -------------------------------------------------------------
+def _strip_comment(line):
+    """Remove a trailing `--` comment, ignoring `--` inside quoted literals."""
+    quote = None
+    for i, ch in enumerate(line):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in ("'", '"'):
+            quote = ch
+        elif line.startswith("--", i):
+            return line[:i]
+    return line
+
+
+def read_sql_file(path):
+    """
+    Split a .sql file into statements.
+
+    The numbered comment preceding a statement (`-- 4. List unique ...`)
+    becomes its description.
+
+    Returns:
+        List of {'description', 'sql'} dicts
+    """
+    queries = []
+    description = None
+    lines = []
+    with open(path, encoding="utf-8") as f:
+        for raw in f:
+            stripped = raw.strip()
+            m = re.match(r"--\s*(\d+\..*)", stripped)
+            if m and not lines:
+                description = m.group(1).strip()
+                continue
+            line = _strip_comment(raw).rstrip()
+            if not line:
+                continue
+            lines.append(line)
+            if line.endswith(";"):
+                sql = "\n".join(lines)
+                queries.append({
+                    "description": description or sql.split("\n")[0],
+                    "sql": sql,
+                })
+                description = None
+                lines = []
+    return queries
+
+
+# -------------------------------------------------------------
+# PROFILING
+# -------------------------------------------------------------
+def _plan_nodes(plan, parent_relation=None):
+    """Yield (node, relation) for every node of an EXPLAIN JSON plan tree."""
+    relation = plan.get("Relation Name") or parent_relation
+    yield plan, relation
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child, None)
+
+
+def _scan_relation(plan):
+    """Return the first relation scanned under a plan node, if any."""
+    for node, relation in _plan_nodes(plan):
+        if relation:
+            return relation, node.get("Node Type")
+    return None, None
+
+
+def _key_columns(keys):
+    """Turn plan keys like 'meetings.date DESC' into bare column names."""
+    cols = []
+    for key in keys:
+        key = re.sub(r"\s+(DESC|ASC|NULLS (FIRST|LAST))\b", "", key).strip("() ")
+        col = key.split(".")[-1]
+        if re.fullmatch(r"\w+", col) and col not in cols:
+            cols.append(col)
+    return cols
+
+
+def _filter_columns(condition):
+    """
+    Column names compared in a plan filter such as
+    `((status)::text = 'done'::text)`: literals, type casts and
+    parentheses are dropped before matching `column <operator>`.
+    """
+    condition = re.sub(r"'(?:[^']|'')*'", "''", condition)
+    condition = re.sub(r"::\"?\w+(?:\s+(?:varying|precision|with(?:out)?\s+time\s+zone))?\"?(?:\[\])?",
+                       "", condition)
+    condition = condition.replace("(", " ").replace(")", " ")
+    cols = re.findall(r"(\w+)\s*(?:=|>=|<=|<>|!=|>|<|IS NOT NULL|IS NULL|~~\*|~~)", condition)
+    return [c for c in dict.fromkeys(cols) if not c.isdigit()]
+
+
+def suggest_indexes(plan, analyzed):
+    """
+    Suggest candidate indexes for slow sort / distinct / group / filter nodes
+    that sit on top of a sequential scan.
+    """
+    suggestions = []
+
+    def slow(node):
+        if analyzed:
+            return node.get("Actual Total Time", 0) >= SLOW_NODE_MS
+        return node.get("Total Cost", 0) >= SLOW_NODE_COST
+
+    for node, _ in _plan_nodes(plan):
+        node_type = node.get("Node Type")
+        if not slow(node):
+            continue
+        keys = node.get("Sort Key") or node.get("Group Key") or []
+        if node_type in ("Sort", "Unique", "Aggregate", "Incremental Sort") and keys:
+            relation, scan = _scan_relation(node)
+            cols = _key_columns(keys)
+            if relation and cols and scan == "Seq Scan":
+                suggestions.append(
+                    f"CREATE INDEX ON {relation} ({', '.join(cols)});  "
+                    f"-- {node_type} on {', '.join(cols)} over a sequential scan")
+        elif node_type == "Seq Scan" and node.get("Filter"):
+            cols = _filter_columns(node["Filter"])
+            if cols:
+                relation = node.get("Relation Name")
+                suggestions.append(
+                    f"CREATE INDEX ON {relation} ({', '.join(cols)});  "
+                    f"-- filter: {node['Filter']}")
+    return list(dict.fromkeys(suggestions))
+
+
+def profile_query(sql, analyze=False, timeout_ms=30000):
+    """
+    Execute one query and profile it.
+
+    Without `analyze` the query is executed and timed, and the plan cost
+    comes from a plain EXPLAIN. With `analyze` the plan (and timing) come
+    from EXPLAIN (ANALYZE, BUFFERS), which executes the query once.
+
+    Returns:
+        dict with 'sql', 'wall_ms', 'rows', 'total_cost', 'plan',
+        'buffers' (ANALYZE only), 'suggestions' and 'error'
+    """
+    statement = sql.strip().rstrip(";")
+    result = {"sql": statement, "wall_ms": None, "rows": None, "total_cost": None,
+              "plan": None, "buffers": None, "suggestions": [], "error": None}
+    try:
+        cursor.execute(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+        options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+        start = time.perf_counter()
+        cursor.execute(f"EXPLAIN ({options}) {statement}")
+        row = cursor.fetchone()
+        explain_ms = (time.perf_counter() - start) * 1000
+        if row is None:
+            raise psycopg2.ProgrammingError("EXPLAIN returned no plan")
+        explain = row[0]
+        if isinstance(explain, str):
+            explain = json.loads(explain)
+        plan = explain[0]["Plan"]
+        result["plan"] = plan
+        result["total_cost"] = plan.get("Total Cost")
+
+        if analyze:
+            result["wall_ms"] = explain_ms
+            result["rows"] = plan.get("Actual Rows")
+            result["buffers"] = {
+                "shared_hit": plan.get("Shared Hit Blocks", 0),
+                "shared_read": plan.get("Shared Read Blocks", 0),
+                "temp_written": plan.get("Temp Written Blocks", 0),
+            }
+        else:
+            start = time.perf_counter()
+            cursor.execute(statement)
+            rows = 0
+            if cursor.description is not None:
+                while True:
+                    chunk = cursor.fetchmany(10000)
+                    if not chunk:
+                        break
+                    rows += len(chunk)
+            result["wall_ms"] = (time.perf_counter() - start) * 1000
+            result["rows"] = rows
+
+        result["suggestions"] = suggest_indexes(plan, analyze)
+    except psycopg2.Error as e:
+        result["error"] = str(e).strip().split("\n")[0]
+    finally:
+        # Never keep anything a profiled statement did, and clear an aborted transaction
+        conn.rollback()
+    return result
+
+
+def profile_queries(queries, analyze=False, timeout_ms=30000):
+    """
+    Profile a list of {'description', 'sql'} dicts (as produced by
+    generate_sql_queries or read_sql_file).
+
+    Returns:
+        The same dicts with a 'profile' entry added (see profile_query)
+    """
+    for q in queries:
+        q["profile"] = profile_query(q["sql"], analyze, timeout_ms)
+    return queries
+
+
+def print_profile_report(queries):
+    """Print one line per profiled query plus index suggestions."""
+    print("=" * 60)
+    print("Query Profile")
+    print("=" * 60)
+    print(f"{'#':>3s} {'wall ms':>10s} {'rows':>9s} {'cost':>12s}  description")
+    for i, q in enumerate(queries, 1):
+        p = q["profile"]
+        if p["error"]:
+            print(f"{i:3d} {'-':>10s} {'-':>9s} {'-':>12s}  {q['description']}")
+            print(f"      ✗ {p['error']}")
+            continue
+        print(f"{i:3d} {p['wall_ms']:10.1f} {p['rows']:9d} {p['total_cost']:12.1f}  {q['description']}")
+        if p["buffers"]:
+            b = p["buffers"]
+            print(f"      buffers: hit={b['shared_hit']} read={b['shared_read']} temp={b['temp_written']}")
+        for suggestion in p["suggestions"]:
+            print(f"      → {suggestion}")
+
+    slowest = sorted((q for q in queries if not q["profile"]["error"]),
+                     key=lambda q: -q["profile"]["wall_ms"])[:3]
+    if slowest:
+        print("\nSlowest queries:")
+        for q in slowest:
+            print(f"  {q['profile']['wall_ms']:10.1f} ms  {q['description']}")
+
+
+# -------------------------------------------------------------
+# MAIN
+# -------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Execute and profile the queries in a .sql file")
+    parser.add_argument("sql_file", help="e.g. documenter_queries.sql")
+    parser.add_argument("--analyze", action="store_true",
+                        help="Use EXPLAIN (ANALYZE, BUFFERS) for actual times and buffers")
+    parser.add_argument("--timeout-ms", type=int, default=30000,
+                        help="Statement timeout per query (default 30000)")
+    args = parser.parse_args()
+
+    queries = read_sql_file(args.sql_file)
+    print(f"Profiling {len(queries)} queries from {args.sql_file}\n")
+    print_profile_report(profile_queries(queries, args.analyze, args.timeout_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Long-running query service with a warm MeTTa space.
+
+Scripts that build a new MeTTa() and call load_all pay the whole load for
+every invocation. This daemon loads once (from the database, or from a
+snapshot written by export_metta.py / checkpoint_loader.py) and then serves
+queries over local HTTP, on a TCP port or a Unix socket.
+
+Endpoints (POST, JSON body -> JSON response):
+    /query_by_id              {"table", "id", "properties"}
+    /query_batch              {"table", "ids", "properties", "batch_size"}
+    /query_by_property_value  {"table", "property", "value"}
+    /metta                    {"program"}
+    /batch                    {"requests": [{"op": "query_by_id", ...}, ...]}
+GET /health returns the space stats and request counters.
+
+A hyperon interpreter is not thread-safe, so every query runs on a single
+interpreter thread; /batch runs all its sub-requests in one turn of that
+thread. At most --max-concurrent requests are admitted at once (others get
+503), and a request waiting longer than its timeout gets 504. A request's
+"timeout" (at most --timeout) also bounds the MeTTa queries it runs: what is
+left of it when the request reaches the interpreter thread is passed to
+them, so a runaway query is aborted (504) instead of holding the
+interpreter thread for later requests. --max-results (and --timeout for
+queries without a request timeout, connect.set_query_limits) applies to
+every query (413 / 504). Atoms in results are returned as their MeTTa text.
+
+Usage:
+    python query_service.py [--snapshot DIR | --row-store DIR] [--port 8765 | --socket PATH]
+                            [--max-concurrent 16] [--timeout 30] [--max-results 10000]
+                            [--window meetings:date:90 ... --refresh-interval 3600]
+
+Clients: see service_client.py.
+"""
+
+import argparse
+import functools
+import json
+import os
+import socketserver
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from hyperon import MeTTa
+
+from connect import (
+    QueryTimeout,
+    ResultLimitExceeded,
+    get_space_state,
+    get_space_stats,
+    get_tables,
+    load_all,
+    query_batch,
+    query_by_id,
+    query_by_property_value,
+    run_guarded,
+    set_query_limits,
+    set_row_store,
+)
+
+DEFAULT_PORT = 8765
+DEFAULT_TIMEOUT_S = 30.0
+DEFAULT_MAX_CONCURRENT = 16
+MAX_BATCH_REQUESTS = 1000
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+# Fields each operation reads from its request (optional ones use .get)
+REQUIRED_FIELDS = {
+    "query_by_id": ("table", "id"),
+    "query_batch": ("table", "ids"),
+    "query_by_property_value": ("table", "property", "value"),
+    "metta": ("program",),
+    "batch": ("requests",),
+}
+
+
+def _missing_fields(op, req):
+    """Required fields of `op` absent from a request."""
+    return [f for f in REQUIRED_FIELDS.get(op, ()) if f not in req]
+
+
+def _jsonable(value):
+    """Convert query results (hyperon atoms, nested lists) to JSON values."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, dict):
+        return {k: _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    return str(value)
+
+
+class QueryService:
+    """A warm interpreter plus the admission and timeout policy around it."""
+
+    def __init__(self, interp, max_concurrent=DEFAULT_MAX_CONCURRENT,
+                 timeout_s=DEFAULT_TIMEOUT_S):
+        self.interp = interp
+        self.timeout_s = timeout_s
+        self.slots = threading.BoundedSemaphore(max_concurrent)
+        # One interpreter thread: hyperon spaces must not be used concurrently
+        self.worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="metta")
+        self.counters = {"requests": 0, "rejected": 0, "timeouts": 0, "errors": 0}
+        # Request threads update the counters concurrently
+        self._counters_lock = threading.Lock()
+        self.started = time.time()
+        self.ops = {
+            "query_by_id": self._query_by_id,
+            "query_batch": self._query_batch,
+            "query_by_property_value": self._query_by_property_value,
+            "metta": self._metta,
+        }
+
+    # Operations (run on the interpreter thread) ---------------------
+    # Each gets the request's deadline (time.perf_counter() based)
+    @staticmethod
+    def _remaining(deadline):
+        """Seconds left until a request's deadline; QueryTimeout once it passed."""
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            raise QueryTimeout("request timed out before its query ran")
+        return remaining
+
+    def _query_by_id(self, req, deadline):
+        # ID lookups are bounded by the record; a request already late is dropped
+        self._remaining(deadline)
+        return query_by_id(self.interp, req["table"], req["id"], req.get("properties"))
+
+    def _query_batch(self, req, deadline):
+        self._remaining(deadline)
+        return query_batch(self.interp, req["table"], req["ids"], req.get("properties"),
+                           req.get("batch_size", 50))
+
+    def _query_by_property_value(self, req, deadline):
+        return query_by_property_value(self.interp, req["table"], req["property"],
+                                       req["value"], timeout_s=self._remaining(deadline))
+
+    def _metta(self, req, deadline):
+        return run_guarded(self.interp, req["program"], timeout_s=self._remaining(deadline))
+
+    def _batch(self, req, deadline):
+        out = []
+        for sub in req["requests"]:
+            error = self._invalid(sub.get("op"), sub)
+            if error:
+                out.append({"error": error})
+                continue
+            try:
+                out.append({"result": _jsonable(self.ops[sub["op"]](sub, deadline))})
+            except Exception as e:
+                out.append({"error": f"{type(e).__name__}: {e}"})
+        return out
+
+    def _invalid(self, op, req):
+        """Why a (sub-)request cannot run, or None if it is well-formed."""
+        if op not in self.ops:
+            return f"unknown operation: {op}"
+        missing = _missing_fields(op, req)
+        if missing:
+            return f"missing field(s): {', '.join(missing)}"
+        return None
+
+    def _count(self, counter):
+        with self._counters_lock:
+            self.counters[counter] += 1
+
+    # Admission ------------------------------------------------------
+    def handle(self, op, req):
+        """
+        Run one request. Returns (http_status, payload).
+        """
+        if op != "batch" and op not in self.ops:
+            return 404, {"error": f"unknown operation: {op}"}
+        if not isinstance(req, dict):
+            return 400, {"error": "request body must be a JSON object"}
+        missing = _missing_fields(op, req)
+        if missing:
+            return 400, {"error": f"missing field(s): {', '.join(missing)}"}
+        if op == "batch":
+            requests = req["requests"]
+            if not isinstance(requests, list) or not all(isinstance(r, dict) for r in requests):
+                return 400, {"error": "requests must be a list of objects"}
+            if len(requests) > MAX_BATCH_REQUESTS:
+                return 400, {"error": f"batch larger than {MAX_BATCH_REQUESTS} requests"}
+            fn = self._batch
+        else:
+            fn = self.ops[op]
+        try:
+            timeout_s = min(float(req.get("timeout", self.timeout_s)), self.timeout_s)
+        except (TypeError, ValueError):
+            return 400, {"error": "timeout must be a number"}
+
+        if not self.slots.acquire(blocking=False):
+            self._count("rejected")
+            return 503, {"error": "too many concurrent requests"}
+        try:
+            self._count("requests")
+            future = self.worker.submit(fn, req, time.perf_counter() + timeout_s)
+            try:
+                result = future.result(timeout=timeout_s)
+            except FutureTimeout:
+                # A queued request is dropped; a running one cannot be interrupted
+                future.cancel()
+                self._count("timeouts")
+                return 504, {"error": f"timed out after {timeout_s}s"}
+            except QueryTimeout as e:
+                self._count("timeouts")
+                return 504, {"error": str(e)}
+            except ResultLimitExceeded as e:
+                return 413, {"error": str(e)}
+            except Exception as e:
+                self._count("errors")
+                return 500, {"error": f"{type(e).__name__}: {e}"}
+            return 200, {"result": _jsonable(result)}
+        finally:
+            self.slots.release()
+
+    def start_window_refresh(self, windows, interval_s):
+        """
+        Refresh time-windowed tables (windowed_loader.refresh_window) every
+        `interval_s` seconds, on the interpreter thread between queries.
+        """
+        from windowed_loader import refresh_window
+
+        def loop():
+            while True:
+                time.sleep(interval_s)
+                try:
+                    self.worker.submit(refresh_window, self.interp, windows).result()
+                except Exception as e:
+                    print(f"Window refresh failed: {e}")
+
+        threading.Thread(target=loop, name="window-refresh", daemon=True).start()
+
+    def health(self):
+        stats = get_space_stats(self.interp)
+        health = {
+            "uptime_s": round(time.time() - self.started, 1),
+            "layout": get_space_state(self.interp)["layout"],
+            "rows": stats["rows"],
+            "atoms": stats["atoms"],
+            "bytes": stats["bytes"],
+        }
+        with self._counters_lock:
+            health.update(self.counters)
+        return health
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def __init__(self, service, *args, **kwargs):
+        # Set before the base class handles the request
+        self.service = service
+        super().__init__(*args, **kwargs)
+
+    def address_string(self):
+        # Unix socket peers have no (host, port) address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/health":
+            self._reply(200, self.service.health())
+        else:
+            self._reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self._reply(413, {"error": "request body too large"})
+            return
+        try:
+            req = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._reply(400, {"error": "invalid JSON"})
+            return
+        self._reply(*self.service.handle(self.path.strip("/"), req))
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(service, host="127.0.0.1", port=DEFAULT_PORT, socket_path=None):
+    """Serve `service` until interrupted, on host:port or a Unix socket."""
+    handler = functools.partial(_Handler, service)
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = _UnixHTTPServer(socket_path, handler)
+        where = f"unix:{socket_path}"
+    else:
+        server = ThreadingHTTPServer((host, port), handler)
+        where = f"http://{host}:{port}"
+    print(f"✓ Query service listening on {where}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.worker.shutdown(wait=False)
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve queries from a warm MeTTa space")
+    parser.add_argument("--snapshot", help="Load from an export/checkpoint directory instead of the database")
+    parser.add_argument("--layout", help="Atom layout when loading from the database")
+    parser.add_argument("--partition", action="store_true",
+                        help="Load each table into its own named space (&<table>)")
+    parser.add_argument("--window", action="append", default=[],
+                        help="Load a table through a time window, table:column:days (repeatable)")
+    parser.add_argument("--row-store", help="Read tables from this local row store "
+                                            "(row_store.py) instead of Postgres")
+    parser.add_argument("--refresh-interval", type=float, default=3600,
+                        help="Seconds between window refreshes (default 3600)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--socket", help="Listen on a Unix socket instead of TCP")
+    parser.add_argument("--max-concurrent", type=int, default=DEFAULT_MAX_CONCURRENT)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT_S,
+                        help="Maximum seconds per request (default 30)")
+    parser.add_argument("--max-results", type=int, default=10000,
+                        help="Maximum results per MeTTa query (default 10000)")
+    args = parser.parse_args()
+
+    interp = MeTTa()
+    if args.row_store:
+        set_row_store(args.row_store)
+    start = time.perf_counter()
+    partitions = "table" if args.partition else None
+    windows = {}
+    if args.snapshot:
+        from export_metta import load_metta_files
+        load_metta_files(interp, args.snapshot, partitions=partitions)
+    else:
+        from windowed_loader import parse_window, refresh_window
+        windows = dict(parse_window(w) for w in args.window)
+        load_all(interp, args.layout, partitions,
+                 tables=[t for t in get_tables() if t not in windows])
+        if windows:
+            refresh_window(interp, windows)
+    print(f"✓ Space ready in {time.perf_counter() - start:.1f}s")
+
+    # Interpreter-level limits abort a runaway query itself, not just the wait for it
+    set_query_limits(timeout_s=args.timeout, max_results=args.max_results)
+
+    service = QueryService(interp, args.max_concurrent, args.timeout)
+    if windows:
+        service.start_window_refresh(windows, args.refresh_interval)
+    serve(service, args.host, args.port, args.socket)
+
+
+if __name__ == "__main__":
+    main()
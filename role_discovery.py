@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Shared role discovery: find tables and columns matching role keywords
+(documenter, facilitator, workgroup, ...) in a single catalog query.
+
+Used by list_documenters.py, list_facilitators.py and check_workgroups.py.
+"""
+
+from connect import cursor
+
+
+def discover_roles(keywords):
+    """
+    Find every table and column whose name contains one of the keywords.
+
+    Runs one `ILIKE ANY` query over information_schema.columns (joined with
+    pg_class for row estimates) instead of one get_columns() call per table.
+
+    Args:
+        keywords: List of keywords, e.g. ["documenter", "facilitator"]
+
+    Returns:
+        dict: keyword -> list of matches, in table order. Each match is
+        {'table', 'type', 'columns', 'estimated_rows'} where 'type' is
+        'table_name' (the table name matches; 'columns' lists all its
+        columns) or 'column' ('columns' lists the matching columns).
+        'estimated_rows' is pg_class.reltuples (-1 if never analyzed).
+    """
+    patterns = [f"%{k}%" for k in keywords]
+    cursor.execute("""
+        SELECT c.table_name, c.column_name,
+               COALESCE(cls.reltuples, -1)::bigint AS estimated_rows
+        FROM information_schema.columns c
+        LEFT JOIN pg_class cls
+          ON cls.relname = c.table_name
+         AND cls.relnamespace = 'public'::regnamespace
+        WHERE c.table_schema = 'public'
+          AND (c.table_name ILIKE ANY(%s) OR c.column_name ILIKE ANY(%s))
+        ORDER BY c.table_name, c.ordinal_position;
+    """, (patterns, patterns))
+
+    columns = {}
+    estimates = {}
+    for table, column, estimate in cursor.fetchall():
+        columns.setdefault(table, []).append(column)
+        estimates[table] = estimate
+
+    found = {k: [] for k in keywords}
+    for table, table_cols in columns.items():
+        for keyword in keywords:
+            k = keyword.lower()
+            # The query also returns non-matching columns of matching tables
+            if k in table.lower():
+                found[keyword].append({
+                    'table': table,
+                    'type': 'table_name',
+                    'columns': table_cols,
+                    'estimated_rows': estimates[table],
+                })
+            matching_cols = [c for c in table_cols if k in c.lower()]
+            if matching_cols:
+                found[keyword].append({
+                    'table': table,
+                    'type': 'column',
+                    'columns': matching_cols,
+                    'estimated_rows': estimates[table],
+                })
+    return found
+
+
+def format_estimate(estimate):
+    """Format a row estimate for display."""
+    return "unknown" if estimate is None or estimate < 0 else f"~{estimate}"
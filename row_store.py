@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Local, memory-mapped row store: a read-optimized copy of the tables.
+
+Every restart, load and verification step otherwise goes back to Postgres
+(fetch_table), paying the network round trips to the database each time.
+A RowStore keeps each table in two local files per refresh (generation):
+
+    <dir>/<table>.<gen>.rows    the rows, one pickled tuple per row, back to back
+    <dir>/<table>.<gen>.index   {id: (offset, length)} into the .rows file
+                                (keyed by row position for tables without an id)
+    <dir>/row_store.json        per table: columns, row count, refresh time and
+                                the generation and file names to read
+
+Reads memory-map the .rows file and unpickle rows straight from the mapping
+(a memoryview slice, no copy of the file), looked up by primary key through
+the index. The store is refreshed from Postgres by a sync job:
+
+    python row_store.py ROW_STORE_DIR [--tables t1 t2 ...]    # e.g. from cron
+
+A refresh writes the next generation's files, then atomically replaces the
+manifest, the one file readers find the others through: a reader sees
+either the old or the new generation of a table, never a mix. Readers keep
+using the manifest and mappings they have until they call reload(). The
+files of the generation just replaced are kept, so a reader one refresh
+behind can still open tables it has not read yet; older generations are
+deleted by the next refresh (on POSIX open mappings stay valid). Readers
+should reload() at least once per refresh. Rows are as of the last
+refresh; use Postgres where that is not fresh enough.
+
+connect.set_row_store(directory) makes fetch_table / iter_table (and so
+load_all and the other loaders) read the tables the store has, and the
+windowed loader's SQL fallback look records up in it; load_all then loads
+the store's tables by default. Reading rows needs no database access;
+schema lookups (column data types for columnar_dir, list_atom_types, the
+windowed loader's column check) still query Postgres. The files are
+pickles: only open stores this toolkit wrote.
+
+Usage:
+    from row_store import RowStore
+
+    store = RowStore("row_store/")
+    store.get("action_items", some_id, ["text", "assignee"])
+    store.get_many("action_items", ids, ["text"])
+"""
+
+import argparse
+import json
+import mmap
+import os
+import pickle
+import time
+
+STORE_MANIFEST = "row_store.json"
+
+
+class RowStore:
+    def __init__(self, directory):
+        self.directory = directory
+        self.manifest = self._read_manifest()
+        self._open = {}  # {table: (mmap, memoryview, index, {column: position})}
+
+    # Files ----------------------------------------------------------
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _read_manifest(self):
+        path = self._path(STORE_MANIFEST)
+        if not os.path.exists(path):
+            return {"format": 1, "tables": {}}
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _table(self, table):
+        opened = self._open.get(table)
+        if opened is None:
+            info = self.manifest["tables"][table]
+            with open(self._path(info["index_file"]), "rb") as f:
+                index = pickle.load(f)
+            with open(self._path(info["rows_file"]), "rb") as f:
+                # mmap rejects empty files
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if info["rows"] else None
+            view = memoryview(mm) if mm is not None else memoryview(b"")
+            positions = {col: i for i, col in enumerate(info["columns"])}
+            opened = self._open[table] = (mm, view, index, positions)
+        return opened
+
+    def close(self):
+        """Unmap every open table."""
+        for mm, view, _, _ in self._open.values():
+            view.release()
+            if mm is not None:
+                mm.close()
+        self._open = {}
+
+    def reload(self):
+        """Pick up a refresh done since the store was opened."""
+        self.close()
+        self.manifest = self._read_manifest()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Reading --------------------------------------------------------
+    def tables(self):
+        return list(self.manifest["tables"])
+
+    def has_table(self, table):
+        return table in self.manifest["tables"]
+
+    def columns(self, table):
+        return self.manifest["tables"][table]["columns"]
+
+    def _project(self, table, values, columns, positions):
+        names = self.columns(table)
+        if columns is None:
+            return dict(zip(names, values))
+        row = {"id": values[positions["id"]]} if "id" in positions else {}
+        for col in columns:
+            if col in positions:
+                row[col] = values[positions[col]]
+        return row
+
+    def get(self, table, record_id, columns=None):
+        """
+        One row as a dict ("id" plus `columns`, or every column), or None
+        if the store has no such record.
+        """
+        _, view, index, positions = self._table(table)
+        entry = index.get(record_id)
+        if entry is None:
+            return None
+        offset, length = entry
+        return self._project(table, pickle.loads(view[offset:offset + length]), columns, positions)
+
+    def get_many(self, table, record_ids, columns=None):
+        """Rows for many IDs, in the order given; IDs not in the store are skipped."""
+        _, view, index, positions = self._table(table)
+        rows = []
+        for rid in record_ids:
+            entry = index.get(rid)
+            if entry is not None:
+                offset, length = entry
+                rows.append(self._project(table, pickle.loads(view[offset:offset + length]),
+                                          columns, positions))
+        return rows
+
+    def iter_rows(self, table):
+        """Every row of a table as a dict, in the order the refresh read them."""
+        _, view, index, _ = self._table(table)
+        names = self.columns(table)
+        for offset, length in index.values():
+            yield dict(zip(names, pickle.loads(view[offset:offset + length])))
+
+    def fetch_table(self, table):
+        """Every row of a table as a list of dicts (same shape as connect.fetch_table)."""
+        return list(self.iter_rows(table))
+
+    # Refreshing (needs the database) --------------------------------
+    def refresh(self, tables=None, chunk_size=5000):
+        """
+        Rewrite tables from Postgres (default: every public table).
+
+        Returns:
+            {table: rows written}
+        """
+        # Imported here: reading a store needs no database connection
+        from connect import get_tables, iter_table
+
+        os.makedirs(self.directory, exist_ok=True)
+        if tables is None:
+            tables = get_tables()
+        written = {}
+        for t in tables:
+            start = time.perf_counter()
+            previous = self.manifest["tables"].get(t)
+            generation = previous.get("generation", 0) + 1 if previous else 1
+            rows_file = f"{t}.{generation}.rows"
+            index_file = f"{t}.{generation}.index"
+            columns = None
+            index = {}
+            with open(self._path(rows_file), "wb") as out:
+                offset = 0
+                for row in iter_table(t, chunk_size, use_row_store=False):
+                    if columns is None:
+                        columns = list(row)
+                    data = pickle.dumps(tuple(row.values()), protocol=pickle.HIGHEST_PROTOCOL)
+                    out.write(data)
+                    index[row.get("id", len(index))] = (offset, len(data))
+                    offset += len(data)
+            with open(self._path(index_file), "wb") as f:
+                pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+            # The manifest swap publishes the new generation in one step
+            self.manifest["tables"][t] = {
+                "columns": columns or [],
+                "rows": len(index),
+                "refreshed_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "generation": generation,
+                "rows_file": rows_file,
+                "index_file": index_file,
+                # Kept for readers still on the previous manifest
+                "previous_files": [previous["rows_file"], previous["index_file"]] if previous else [],
+            }
+            self._write_manifest()
+            if previous:
+                self._remove_files(previous.get("previous_files", []))
+            written[t] = len(index)
+            print(f"Refreshed table: {t} ({len(index)} rows, {time.perf_counter() - start:.1f}s)")
+        self.reload()
+        return written
+
+    def _remove_files(self, names):
+        """Delete an old generation's files (readers still mapping them are unaffected)."""
+        for name in names:
+            try:
+                os.remove(self._path(name))
+            except OSError:
+                pass
+
+    def _write_manifest(self):
+        tmp_path = self._path(STORE_MANIFEST + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self._path(STORE_MANIFEST))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the local row store from Postgres")
+    parser.add_argument("directory", help="Row store directory")
+    parser.add_argument("--tables", nargs="*", help="Only refresh these tables")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    store = RowStore(args.directory)
+    written = store.refresh(args.tables, args.chunk_size)
+    print(f"\n✓ Refreshed {sum(written.values())} rows in {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
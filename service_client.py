@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Thin client for query_service.py.
+
+Needs neither hyperon nor a database connection: queries go to the warm
+space of a running service. Result atoms come back as their MeTTa text.
+
+Usage:
+    from service_client import ServiceClient
+
+    client = ServiceClient()                      # http://127.0.0.1:8765
+    client = ServiceClient(socket_path="/tmp/archive-metta.sock")
+    client.query_by_id("action_items", some_id, ["text", "assignee"])
+"""
+
+import http.client
+import json
+import socket
+
+# Same default as query_service.py (not imported: that would load hyperon
+# and connect to the database)
+DEFAULT_PORT = 8765
+
+
+class ServiceError(Exception):
+    """The service answered with an error status."""
+
+    def __init__(self, status, message):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path, timeout):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class ServiceClient:
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, socket_path=None, timeout=60):
+        self.host = host
+        self.port = port
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def _connection(self):
+        if self.socket_path:
+            return _UnixConnection(self.socket_path, self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _request(self, method, path, payload=None):
+        con = self._connection()
+        try:
+            body = None if payload is None else json.dumps(payload, default=str)
+            con.request(method, path, body, {"Content-Type": "application/json"})
+            resp = con.getresponse()
+            data = json.loads(resp.read() or b"{}")
+        finally:
+            con.close()
+        if resp.status != 200:
+            raise ServiceError(resp.status, data.get("error", "request failed"))
+        return data
+
+    def _call(self, op, timeout=None, **fields):
+        if timeout is not None:
+            fields["timeout"] = timeout
+        return self._request("POST", f"/{op}", fields)["result"]
+
+    def health(self):
+        return self._request("GET", "/health")
+
+    def query_by_id(self, table, record_id, properties=None, timeout=None):
+        return self._call("query_by_id", timeout, table=table, id=record_id,
+                          properties=properties)
+
+    def query_batch(self, table, record_ids, properties=None, batch_size=50, timeout=None):
+        return self._call("query_batch", timeout, table=table, ids=list(record_ids),
+                          properties=properties, batch_size=batch_size)
+
+    def query_by_property_value(self, table, property_name, value, timeout=None):
+        return self._call("query_by_property_value", timeout, table=table,
+                          property=property_name, value=value)
+
+    def metta(self, program, timeout=None):
+        return self._call("metta", timeout, program=program)
+
+    def batch(self, requests, timeout=None):
+        """
+        Send several requests in one round trip; they run back to back on
+        the service's interpreter thread.
+
+        Args:
+            requests: List of dicts, e.g. {"op": "query_by_id", "table": ..., "id": ...}
+
+        Returns:
+            One {"result": ...} or {"error": ...} dict per request
+        """
+        return self._call("batch", timeout, requests=list(requests))
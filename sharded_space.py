@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Sharded MeTTa spaces across worker processes, with scatter-gather queries.
+
+A single interpreter holds at most one space's worth of atoms before the
+size limits described in the README bite. ShardedSpace hash-partitions
+rows by ID (crc32 of the ID, modulo the shard count) across N worker
+processes, each running its own interpreter with its shard's atoms:
+
+- query_by_id goes to the one shard owning the ID;
+- query_batch groups IDs per shard and queries the shards in parallel;
+- query_by_property_value scatters to every shard and gathers the IDs.
+
+The coordinator streams each table (iter_table) and ships rows to the
+owning shard, so loading needs no database access in the workers. Workers
+are spawned, not forked: a forked worker would inherit the coordinator's
+psycopg2 connection and share its socket. Importing connect does not open
+a connection (see connect.get_connection), so a worker only connects, with
+its own connection, if a query needs the database (e.g. resolving "ref"
+text columns). Results cross the process boundary as plain Python values,
+so atoms come back as their MeTTa text. As with any spawned process, the
+calling script must create the ShardedSpace under `if __name__ == "__main__":`.
+
+Usage:
+    from sharded_space import ShardedSpace
+
+    with ShardedSpace(n_shards=8) as space:
+        space.load_all()
+        space.query_by_id("action_items", some_id, ["text", "assignee"])
+        space.query_by_property_value("action_items", "status", "active")
+"""
+
+import multiprocessing
+import os
+import threading
+import zlib
+
+from connect import (
+    get_space_state,
+    get_tables,
+    iter_table,
+    query_batch,
+    query_by_id,
+    query_by_property_value,
+    record_row,
+    row_to_atoms,
+    set_layout,
+    set_partitions,
+    table_space,
+)
+from export_metta import load_metta_text
+
+# Row chunks in flight per worker while loading
+MAX_PENDING_LOADS = 2
+
+# Fresh worker processes: nothing (database connection, interpreter) is inherited
+_mp = multiprocessing.get_context("spawn")
+
+
+def shard_for(record_id, n_shards):
+    """Shard owning a record: crc32 of the ID's text, modulo the shard count."""
+    return zlib.crc32(str(record_id).encode("utf-8")) % n_shards
+
+
+def _plain(value):
+    """Convert worker results (atoms, nested lists) to picklable values."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    return str(value)
+
+
+# -------------------------------------------------------------
+# WORKER
+# -------------------------------------------------------------
+def _worker(pipe, layout, partitions):
+    from hyperon import MeTTa
+
+    interp = MeTTa()
+    state = set_layout(interp, layout)
+    if partitions is not None:
+        set_partitions(interp, partitions)
+
+    def load(table, rows):
+        lines = []
+        for row in rows:
+            atoms = row_to_atoms(table, row, layout, state)
+            lines.extend(atoms)
+            record_row(state, table, atoms)
+        token, space = table_space(interp, table)
+        load_metta_text(interp, "\n".join(lines), None if token == "&self" else space)
+        return len(lines)
+
+    ops = {
+        "load": load,
+        "query_by_id": lambda *a: query_by_id(interp, *a),
+        "query_batch": lambda *a: query_batch(interp, *a),
+        "query_by_property_value": lambda *a: query_by_property_value(interp, *a),
+        "stats": lambda: get_space_state(interp)["stats"],
+    }
+    while True:
+        op, args = pipe.recv()
+        if op == "stop":
+            break
+        try:
+            pipe.send(("ok", _plain(ops[op](*args))))
+        except Exception as e:
+            pipe.send(("error", f"{type(e).__name__}: {e}"))
+
+
+class ShardError(RuntimeError):
+    """One or more shard workers failed to execute a request."""
+
+    def __init__(self, failures):
+        self.failures = failures  # {shard: error message}
+        super().__init__("; ".join(f"shard {shard}: {msg}" for shard, msg in sorted(failures.items())))
+
+
+# -------------------------------------------------------------
+# COORDINATOR
+# -------------------------------------------------------------
+class ShardedSpace:
+    """Coordinator for N shard worker processes (see module docstring)."""
+
+    def __init__(self, n_shards=None, layout="property", partitions=None):
+        self.n_shards = n_shards or os.cpu_count() or 1
+        self.layout = layout
+        self._lock = threading.Lock()
+        self._pipes = []
+        self._procs = []
+        for i in range(self.n_shards):
+            parent, child = _mp.Pipe()
+            proc = _mp.Process(target=_worker, args=(child, layout, partitions),
+                                           name=f"metta-shard-{i}", daemon=True)
+            proc.start()
+            child.close()
+            self._pipes.append(parent)
+            self._procs.append(proc)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Stop the workers."""
+        for pipe in self._pipes:
+            try:
+                pipe.send(("stop", ()))
+            except (BrokenPipeError, OSError):
+                pass
+        for proc in self._procs:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+        self._pipes = []
+        self._procs = []
+
+    # Transport ------------------------------------------------------
+    def _scatter(self, requests):
+        """
+        Send {shard: (op, args)} to every shard first, then gather {shard: result}.
+        Every reply is read before raising, so no stale reply is left in a pipe.
+        """
+        with self._lock:
+            for shard, request in requests.items():
+                self._pipes[shard].send(request)
+            replies = {shard: self._pipes[shard].recv() for shard in requests}
+        failures = {shard: result for shard, (status, result) in replies.items() if status != "ok"}
+        if failures:
+            raise ShardError(failures)
+        return {shard: result for shard, (_, result) in replies.items()}
+
+    # Loading --------------------------------------------------------
+    def load_all(self, tables=None, chunk_size=5000):
+        """
+        Stream every table from the database and load each row into the
+        shard owning its ID. Tables without an id column go to shard 0.
+
+        Returns:
+            Total number of atoms loaded
+
+        Raises:
+            ShardError: after every chunk was sent and answered, if any
+                        shard failed to load one
+        """
+        if tables is None:
+            tables = get_tables()
+        total_atoms = 0
+        failures = {}
+        with self._lock:
+            pending = [0] * self.n_shards
+
+            def receive(shard):
+                nonlocal total_atoms
+                status, result = self._pipes[shard].recv()
+                pending[shard] -= 1
+                if status == "ok":
+                    total_atoms += result
+                else:
+                    failures[shard] = result
+
+            def send(shard, table, rows):
+                if pending[shard] >= MAX_PENDING_LOADS:
+                    receive(shard)
+                self._pipes[shard].send(("load", (table, rows)))
+                pending[shard] += 1
+
+            try:
+                for t in tables:
+                    print(f"Loading table: {t} into {self.n_shards} shards")
+                    buffers = [[] for _ in range(self.n_shards)]
+                    for row in iter_table(t, chunk_size):
+                        rid = row.get("id")
+                        shard = 0 if rid is None else shard_for(rid, self.n_shards)
+                        buffers[shard].append(row)
+                        if len(buffers[shard]) >= chunk_size:
+                            send(shard, t, buffers[shard])
+                            buffers[shard] = []
+                    for shard, rows in enumerate(buffers):
+                        if rows:
+                            send(shard, t, rows)
+            finally:
+                # Drain every outstanding reply, even if reading a table failed
+                for shard in range(self.n_shards):
+                    while pending[shard]:
+                        receive(shard)
+
+        if failures:
+            raise ShardError(failures)
+        print(f"\n✓ Loaded {total_atoms} atoms into {self.n_shards} shards\n")
+        return total_atoms
+
+    # Queries --------------------------------------------------------
+    def query_by_id(self, table, record_id, properties=None):
+        """Query one record on the shard owning its ID."""
+        shard = shard_for(record_id, self.n_shards)
+        return self._scatter({shard: ("query_by_id", (table, record_id, properties))})[shard]
+
+    def query_batch(self, table, record_ids, properties=None, batch_size=50):
+        """
+        Query many records: IDs are grouped per shard and the shards work
+        in parallel. Results keep the order of `record_ids` (missing
+        records are skipped, as in connect.query_batch).
+        """
+        by_shard = {}
+        for rid in record_ids:
+            by_shard.setdefault(shard_for(rid, self.n_shards), []).append(rid)
+        gathered = self._scatter({
+            shard: ("query_batch", (table, ids, properties, batch_size))
+            for shard, ids in by_shard.items()
+        })
+        found = {}
+        for results in gathered.values():
+            for result in results:
+                found[str(result["id"])] = result
+        return [found[str(rid)] for rid in record_ids if str(rid) in found]
+
+    def query_by_property_value(self, table, property_name, value):
+        """Find IDs by property value on every shard and gather the matches."""
+        gathered = self._scatter({
+            shard: ("query_by_property_value", (table, property_name, value))
+            for shard in range(self.n_shards)
+        })
+        return [rid for shard in range(self.n_shards) for rid in gathered[shard]]
+
+    def stats(self):
+        """Per-shard load accounting: [{table: {'rows', 'atoms', 'bytes', ...}}, ...]."""
+        gathered = self._scatter({shard: ("stats", ()) for shard in range(self.n_shards)})
+        return [gathered[shard] for shard in range(self.n_shards)]
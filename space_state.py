@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Python-side bookkeeping for MeTTa spaces loaded by this toolkit.
+
+Kept separate from connect.py (which needs psycopg2 and the database settings)
+so that processes loading exported snapshots can use it without any
+database access. connect.py re-exports everything here.
+"""
+
+import os
+import re
+import weakref
+
+
+class InterpreterMap:
+    """
+    Per-interpreter values that go away together with the interpreter.
+
+    A WeakKeyDictionary cannot be used: MeTTa defines __eq__ without
+    __hash__, so interpreters are unhashable. Entries are keyed by id()
+    and dropped by a weakref callback when the interpreter is collected.
+    """
+
+    def __init__(self):
+        self._data = {}
+
+    def get(self, interp, default=None):
+        entry = self._data.get(id(interp))
+        if entry is None or entry[0]() is not interp:
+            return default
+        return entry[1]
+
+    def __setitem__(self, interp, value):
+        key = id(interp)
+        data = self._data
+        ref = weakref.ref(interp, lambda _ref: data.pop(key, None))
+        data[key] = (ref, value)
+
+    def __len__(self):
+        return len(self._data)
+
+
+# -------------------------------------------------------------
+# SPACE LAYOUTS
+# -------------------------------------------------------------
+# Keyed by interpreter, so the state goes away together with its space.
+_space_state = InterpreterMap()
+
+LAYOUTS = ("property", "compact", "row")
+
+
+def new_space_state(layout="property"):
+    """
+    Create an empty space state.
+
+    Keys:
+    - 'layout': atom layout the space was loaded with
+    - 'ids': {table: {record_id: surrogate_id}} (compact/row layouts)
+    - 'record_ids': {table: [record_id, ...]} indexed by surrogate ID
+    - 'columns': {table: [column, ...]} column order of the row layout
+    - 'stats': {table: {...}} load accounting (see ACCOUNTING below)
+    - 'partitions': None, "table" or {table: group} (see PARTITIONED SPACES)
+    - 'spaces': {group: space} named spaces created for the partitions
+    - 'elide_empty': skip atoms of null/empty values (see set_elision)
+    - 'text_policies': {table: {column: (mode, arg)}} (see TEXT POLICIES)
+    - 'blob_dir': directory of the "blob" policy's files (TEXT_BLOB_DIR,
+      default exports/blobs)
+    """
+    return {
+        "layout": layout,
+        "ids": {},
+        "record_ids": {},
+        "columns": {},
+        "stats": {},
+        "partitions": None,
+        "spaces": {},
+        "elide_empty": False,
+        "text_policies": {},
+        "blob_dir": os.getenv("TEXT_BLOB_DIR", DEFAULT_BLOB_DIR),
+    }
+
+
+def get_space_state(interp):
+    """
+    Return the bookkeeping attached to a MeTTa interpreter
+    (see new_space_state), creating it on first use.
+    """
+    state = _space_state.get(interp)
+    if state is None:
+        state = new_space_state()
+        _space_state[interp] = state
+    return state
+
+
+def attach_space_state(interp, state):
+    """
+    Attach a state built elsewhere (e.g. read from an export) to an interpreter.
+    Partitions already configured on the interpreter are kept.
+    """
+    previous = _space_state.get(interp)
+    if previous is not None and previous.get("partitions") and not state.get("partitions"):
+        state["partitions"] = previous["partitions"]
+        state["spaces"] = previous["spaces"]
+    _space_state[interp] = state
+    return state
+
+
+def set_layout(interp, layout):
+    """
+    Choose the atom layout for an interpreter before loading into it.
+    Switching layouts after records were loaded is not allowed.
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout '{layout}', expected one of {LAYOUTS}")
+    state = get_space_state(interp)
+    if state["layout"] != layout and state["record_ids"]:
+        raise ValueError(f"Space already loaded with layout '{state['layout']}'")
+    state["layout"] = layout
+    return state
+
+
+def set_elision(interp, enabled=True):
+    """
+    Skip property atoms of null and empty values ("", whitespace, empty
+    JSON) when loading into this interpreter. query_by_id reports such
+    properties as None either way. The row layout keeps every column.
+    """
+    state = get_space_state(interp)
+    state["elide_empty"] = enabled
+    return state
+
+
+def assign_surrogate_id(state, table, record_id):
+    """Return the integer surrogate for a record ID, assigning a new one if needed."""
+    ids = state["ids"].setdefault(table, {})
+    sid = ids.get(record_id)
+    if sid is None:
+        record_ids = state["record_ids"].setdefault(table, [])
+        sid = len(record_ids)
+        ids[record_id] = sid
+        record_ids.append(record_id)
+    return sid
+
+
+# -------------------------------------------------------------
+# TEXT POLICIES
+# -------------------------------------------------------------
+# Long text columns (notes, transcripts) dominate the space. A column's
+# policy decides what its property atoms hold:
+#   "inline"      the full text (default)
+#   "truncate:N"  the first N characters, followed by "..."
+#   "hash"        "sha256:<hex>" of the text only
+#   "ref"         (:ref <chars>); query_by_id fetches the text from Postgres
+#   "blob"        (:blob <offset> <bytes>) into <blob_dir>/<table>.<column>.blob,
+#                 a local file written while loading
+TEXT_POLICIES = ("inline", "truncate", "hash", "ref", "blob")
+
+# Where "blob" files go unless TEXT_BLOB_DIR or set_text_policies says otherwise
+DEFAULT_BLOB_DIR = os.path.join("exports", "blobs")
+
+
+def parse_text_policy(spec):
+    """Parse a policy spec ("inline", "truncate:200", ...) into (mode, arg)."""
+    mode, _, arg = spec.partition(":")
+    if mode not in TEXT_POLICIES or (mode == "truncate") != bool(arg):
+        raise ValueError(f"Invalid text policy '{spec}', expected one of "
+                         "inline, truncate:N, hash, ref, blob")
+    if mode == "truncate":
+        return mode, int(arg)
+    return mode, None
+
+
+def parse_text_policies(policies):
+    """Parse {table: {column: spec}} into {table: {column: (mode, arg)}}."""
+    return {
+        table: {col: parse_text_policy(spec) for col, spec in columns.items()}
+        for table, columns in (policies or {}).items()
+    }
+
+
+def set_text_policies(interp, policies, blob_dir=None):
+    """
+    Set per-column text policies before loading into this interpreter.
+
+    Args:
+        interp: MeTTa interpreter
+        policies: {table: {column: spec}}, e.g.
+                  {"meetings": {"transcript": "ref", "notes": "truncate:200"}}
+        blob_dir: Directory for the "blob" policy's files (default: the
+                  TEXT_BLOB_DIR environment variable, else exports/blobs)
+    """
+    state = get_space_state(interp)
+    state["text_policies"] = parse_text_policies(policies)
+    if blob_dir is not None:
+        state["blob_dir"] = blob_dir
+    return state
+
+
+def _blob_path(state, table, column):
+    return os.path.join(state["blob_dir"], f"{table}.{column}.blob")
+
+
+def write_blob(state, table, column, text):
+    """
+    Append a text to its column's blob file. Returns (offset, length) in bytes.
+
+    A state's first write to a file truncates it: offsets written by an
+    earlier load are not referenced by this space, so the file does not
+    grow across loads. Files kept by keep_blob_files are appended to.
+    """
+    path = _blob_path(state, table, column)
+    files = state.setdefault("blob_files", {})
+    f = files.get(path)
+    if f is None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        kept = state.setdefault("blob_kept", set())
+        f = files[path] = open(path, "ab" if path in kept else "wb")
+        kept.add(path)
+    data = text.encode("utf-8")
+    offset = f.tell()
+    f.write(data)
+    return offset, len(data)
+
+
+def keep_blob_files(state):
+    """
+    Mark the blob files of the state's "blob" columns as holding texts its
+    space references (e.g. loaded from an export), so writes append to them.
+    """
+    kept = state.setdefault("blob_kept", set())
+    for table, columns in state["text_policies"].items():
+        for column, (mode, _) in columns.items():
+            if mode == "blob":
+                kept.add(_blob_path(state, table, column))
+
+
+def close_blob_files(state):
+    """Close the blob files written to while loading or exporting."""
+    for f in state.pop("blob_files", {}).values():
+        f.close()
+
+
+def read_blob(state, table, column, offset, length):
+    """Read back a text written by write_blob."""
+    path = _blob_path(state, table, column)
+    writer = state.get("blob_files", {}).get(path)
+    if writer is not None:
+        writer.flush()
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return f.read(length).decode("utf-8")
+
+
+# -------------------------------------------------------------
+# PARTITIONED SPACES
+# -------------------------------------------------------------
+# By default every table is loaded into &self, so a match on one table
+# searches the atoms of all of them. With partitions, a table (or a group
+# of tables) gets its own space, registered as the token &<group>; the
+# loaders and query helpers route through table_space().
+def set_partitions(interp, partitions="table"):
+    """
+    Load tables into their own named spaces instead of &self.
+
+    Args:
+        interp: MeTTa interpreter (set before loading)
+        partitions: "table" for one space per table (&action_items, ...),
+                    or {table: group} to share a space per group; tables
+                    not listed stay in &self. None turns partitioning off.
+    """
+    state = get_space_state(interp)
+    if state["stats"] and partitions != state.get("partitions"):
+        raise ValueError("Partitions must be set before loading")
+    if partitions is not None and partitions != "table" and not isinstance(partitions, dict):
+        raise ValueError(f"Unknown partitions {partitions!r}, expected 'table' or a dict")
+    state["partitions"] = partitions
+    return state
+
+
+def table_space(interp, table):
+    """
+    Return (token, space) holding a table: ("&self", interp.space()) unless
+    the table is partitioned, in which case its named space is created and
+    registered on first use.
+    """
+    state = get_space_state(interp)
+    partitions = state.get("partitions")
+    group = table if partitions == "table" else (partitions or {}).get(table)
+    if group is None:
+        return "&self", interp.space()
+    token = f"&{group}"
+    space = state["spaces"].get(group)
+    if space is None:
+        from hyperon import G, GroundingSpaceRef
+        space = state["spaces"][group] = GroundingSpaceRef()
+        space_atom = G(space)
+        interp.register_token(re.escape(token), lambda _token: space_atom)
+    return token, space
+
+
+# -------------------------------------------------------------
+# ACCOUNTING
+# -------------------------------------------------------------
+# space.get_atoms() and space.atom_count() panic on large spaces, so the
+# loaders count what they add instead. Bytes are an estimate: the atom text
+# plus a fixed per-atom overhead for the space's own structures (calibrate
+# with benchmarks/memory_layouts.py).
+ATOM_OVERHEAD_BYTES = 96
+
+
+def empty_table_stats():
+    """Accounting entry for one table ('elided': atoms skipped by elision)."""
+    return {"rows": 0, "atoms": 0, "bytes": 0, "properties": {},
+            "elided": {"atoms": 0, "bytes": 0, "properties": {}}}
+
+
+def _table_stats(state, table):
+    ts = state["stats"].get(table)
+    if ts is None:
+        ts = state["stats"][table] = empty_table_stats()
+    return ts
+
+
+def record_row(state, table, atoms, sign=1):
+    """
+    Account for one row's atoms (as produced by row_to_atoms).
+
+    Property atoms are counted under their column name; entity atoms
+    under "id" ("row" for the row layout). sign=-1 takes a removed row's
+    atoms back out of the accounting.
+    """
+    ts = _table_stats(state, table)
+    ts["rows"] += sign
+    props = ts["properties"]
+    entity = "row" if state["layout"] == "row" else "id"
+    prefix_len = len(table) + 2  # "(:" + table
+
+    for atom_str in atoms:
+        size = (len(atom_str) + ATOM_OVERHEAD_BYTES) * sign
+        head = atom_str[prefix_len:atom_str.index(" ")]  # ".col" or "" for entity atoms
+        prop = head[1:] if head else entity
+        ps = props.get(prop)
+        if ps is None:
+            ps = props[prop] = {"atoms": 0, "bytes": 0}
+        ps["atoms"] += sign
+        ps["bytes"] += size
+        ts["atoms"] += sign
+        ts["bytes"] += size
+
+
+def record_elided(state, table, prop, atom_len):
+    """Account for a property atom of `atom_len` characters skipped by elision."""
+    elided = _table_stats(state, table).setdefault(
+        "elided", {"atoms": 0, "bytes": 0, "properties": {}})
+    elided["atoms"] += 1
+    elided["bytes"] += atom_len + ATOM_OVERHEAD_BYTES
+    elided["properties"][prop] = elided["properties"].get(prop, 0) + 1
+
+
+def add_table_stats(target, source):
+    """Add one table's accounting (`source`) into another entry (`target`)."""
+    for key in ("rows", "atoms", "bytes"):
+        target[key] += source.get(key, 0)
+    for prop, ps in source.get("properties", {}).items():
+        tp = target["properties"].setdefault(prop, {"atoms": 0, "bytes": 0})
+        tp["atoms"] += ps["atoms"]
+        tp["bytes"] += ps["bytes"]
+    if "elided" in source:
+        te = target.setdefault("elided", {"atoms": 0, "bytes": 0, "properties": {}})
+        te["atoms"] += source["elided"]["atoms"]
+        te["bytes"] += source["elided"]["bytes"]
+        for prop, n in source["elided"]["properties"].items():
+            te["properties"][prop] = te["properties"].get(prop, 0) + n
+
+
+def merge_stats(state, table, table_stats):
+    """Add accounting recorded elsewhere (e.g. in an export manifest) for a table."""
+    add_table_stats(_table_stats(state, table), table_stats)
+
+
+def get_space_stats(interp):
+    """
+    Return the loader's accounting for an interpreter's space.
+
+    Never touches the space itself, so it is safe on spaces of any size.
+
+    Returns:
+        dict with 'rows', 'atoms' and 'bytes' totals and 'tables':
+        {table: {'rows', 'atoms', 'bytes', 'properties': {prop: {'atoms', 'bytes'}}}}
+    """
+    tables = get_space_state(interp)["stats"]
+    return {
+        "rows": sum(t["rows"] for t in tables.values()),
+        "atoms": sum(t["atoms"] for t in tables.values()),
+        "bytes": sum(t["bytes"] for t in tables.values()),
+        "tables": tables,
+    }
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Token/trigram inverted index over loaded text properties.
+
+A MeTTa match can only compare whole values, and SQL ILIKE is a sequential
+scan, so "find action items mentioning X" has no cheap path. With an index
+configured, the loaders feed it each row's text columns (row_to_atoms calls
+TextIndex.add_row) and search_text ranks record IDs by how well they match:
+
+    load_all(interp, text_index={"action_items": ["text"], "meetings": ["summary"]})
+    ids = search_text(interp, "action_items", "budget revi")   # prefix match on "revi"
+    query_batch(interp, "action_items", ids, ["text", "assignee"])
+
+Text is split into lowercase word tokens. Query terms match tokens exactly,
+by prefix, or (match="substring") anywhere inside a token; candidate tokens
+are found through a trigram index over the vocabulary. Records matching
+more query terms rank first, then by a tf-idf score with exact matches
+weighted above prefix and substring matches.
+
+Like space_state.py, this module needs no database access: the index is
+saved next to an export (export_metta.py) and read back by load_metta_files.
+"""
+
+import heapq
+import json
+import math
+import re
+
+from space_state import get_space_state
+
+INDEX_NAME = "text_index.json"
+MATCH_MODES = ("token", "prefix", "substring")
+
+# Score weight of a query term matching a token exactly / by prefix / inside it
+EXACT_WEIGHT = 1.0
+PREFIX_WEIGHT = 0.6
+SUBSTRING_WEIGHT = 0.3
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Lowercase word tokens of a text."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def trigrams(token):
+    """Distinct 3-character substrings of a token (none for shorter tokens)."""
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+
+class TextIndex:
+    """
+    Inverted index {table: {column: {token: {record_id: term_frequency}}}},
+    plus a per-table trigram index over the token vocabulary and each
+    record's (column, token) list, so records can be removed again.
+    """
+
+    def __init__(self, columns=None):
+        self.columns = {t: list(cols) for t, cols in (columns or {}).items()}
+        self.postings = {}
+        self._vocab = {}
+        self._trigrams = {}
+        self._docs = {}  # {table: {record_id: [(column, token), ...]}}
+
+    # Building -------------------------------------------------------
+    def add_row(self, table, record_id, row):
+        """Index the configured text columns of one row."""
+        for col in self.columns.get(table, ()):
+            val = row.get(col)
+            if isinstance(val, str) and val:
+                self.add(table, record_id, col, val)
+
+    def add(self, table, record_id, column, text):
+        """Index one text value of a record."""
+        postings = self.postings.setdefault(table, {}).setdefault(column, {})
+        counts = {}
+        for tok in tokenize(text):
+            counts[tok] = counts.get(tok, 0) + 1
+        for tok, n in counts.items():
+            docs = postings.get(tok)
+            if docs is None:
+                docs = postings[tok] = {}
+                self._add_vocab(table, tok)
+            docs[record_id] = docs.get(record_id, 0) + n
+        self._docs.setdefault(table, {}).setdefault(record_id, []).extend(
+            (column, tok) for tok in counts)
+
+    def _add_vocab(self, table, tok):
+        vocab = self._vocab.setdefault(table, set())
+        if tok in vocab:
+            return
+        vocab.add(tok)
+        grams = self._trigrams.setdefault(table, {})
+        for g in trigrams(tok):
+            grams.setdefault(g, set()).add(tok)
+
+    def remove(self, table, record_id):
+        """Drop a record from a table's index (no-op if it was not indexed)."""
+        entries = self._docs.get(table, {}).pop(record_id, None)
+        if not entries:
+            return
+        table_postings = self.postings[table]
+        for col, tok in entries:
+            postings = table_postings[col]
+            docs = postings.get(tok)
+            if docs is not None:
+                docs.pop(record_id, None)
+                if not docs:
+                    del postings[tok]
+                    if not any(tok in p for p in table_postings.values()):
+                        self._remove_vocab(table, tok)
+
+    def _remove_vocab(self, table, tok):
+        """Drop a token no record of the table contains any more."""
+        self._vocab.get(table, set()).discard(tok)
+        grams = self._trigrams.get(table, {})
+        for g in trigrams(tok):
+            toks = grams.get(g)
+            if toks is not None:
+                toks.discard(tok)
+                if not toks:
+                    del grams[g]
+
+    # Searching ------------------------------------------------------
+    def _expand(self, table, term, match):
+        """Yield (token, weight) for the indexed tokens a query term matches."""
+        if match == "token":
+            yield term, EXACT_WEIGHT
+            return
+        grams = trigrams(term)
+        if grams:
+            index = self._trigrams.get(table, {})
+            candidates = set.intersection(*(index.get(g, set()) for g in grams))
+        else:
+            candidates = self._vocab.get(table, ())
+        for tok in candidates:
+            if tok == term:
+                yield tok, EXACT_WEIGHT
+            elif tok.startswith(term):
+                yield tok, PREFIX_WEIGHT
+            elif match == "substring" and term in tok:
+                yield tok, SUBSTRING_WEIGHT
+
+    def search(self, table, query, limit=20, columns=None, match="prefix", with_scores=False):
+        """
+        Rank a table's records against a query (see module docstring).
+
+        Returns:
+            Up to `limit` record IDs, best first; (record_id, score) pairs
+            with with_scores=True
+        """
+        if match not in MATCH_MODES:
+            raise ValueError(f"Unknown match mode '{match}', expected one of {MATCH_MODES}")
+        table_postings = self.postings.get(table, {})
+        columns = columns or list(table_postings)
+        n_docs = len(self._docs.get(table, ())) or 1
+        scores = {}
+        matched = {}
+
+        for term in dict.fromkeys(tokenize(query)):
+            best = {}  # record_id -> best score of this term over tokens and columns
+            for tok, weight in self._expand(table, term, match):
+                for col in columns:
+                    docs = table_postings.get(col, {}).get(tok)
+                    if not docs:
+                        continue
+                    idf = math.log(1 + n_docs / len(docs))
+                    for rid, tf in docs.items():
+                        score = weight * idf * tf / (tf + 1.0)
+                        if score > best.get(rid, 0.0):
+                            best[rid] = score
+            for rid, score in best.items():
+                scores[rid] = scores.get(rid, 0.0) + score
+                matched[rid] = matched.get(rid, 0) + 1
+
+        ranked = heapq.nsmallest(limit, scores, key=lambda rid: (-matched[rid], -scores[rid]))
+        if with_scores:
+            return [(rid, round(scores[rid], 4)) for rid in ranked]
+        return ranked
+
+    # Persistence ----------------------------------------------------
+    def save(self, path):
+        """Write the index as JSON (record IDs keep their JSON type)."""
+        data = {
+            "format": 1,
+            "columns": self.columns,
+            "postings": {
+                table: {
+                    col: {tok: list(docs.items()) for tok, docs in postings.items()}
+                    for col, postings in cols.items()
+                }
+                for table, cols in self.postings.items()
+            },
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, default=str)
+
+    @classmethod
+    def load(cls, path):
+        """Read an index written by save; the lookup structures are rebuilt."""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        index = cls(data["columns"])
+        for table, cols in data["postings"].items():
+            records = index._docs.setdefault(table, {})
+            for col, postings in cols.items():
+                target = index.postings.setdefault(table, {}).setdefault(col, {})
+                for tok, docs in postings.items():
+                    target[tok] = dict(docs)
+                    for rid in target[tok]:
+                        records.setdefault(rid, []).append((col, tok))
+                    index._add_vocab(table, tok)
+        return index
+
+
+# -------------------------------------------------------------
+# PER-INTERPRETER INDEX
+# -------------------------------------------------------------
+def set_text_index(interp, columns):
+    """
+    Index text columns of the rows loaded into this interpreter from now on.
+
+    Args:
+        interp: MeTTa interpreter (set before loading)
+        columns: {table: [column, ...]}
+    """
+    state = get_space_state(interp)
+    index = state.get("text_index")
+    if index is None:
+        index = state["text_index"] = TextIndex()
+    for table, cols in columns.items():
+        known = index.columns.setdefault(table, [])
+        known.extend(c for c in cols if c not in known)
+    return index
+
+
+def get_text_index(interp):
+    """The interpreter's TextIndex, or None if none was configured or loaded."""
+    return get_space_state(interp).get("text_index")
+
+
+def search_text(interp, table, query, limit=20, columns=None, match="prefix", with_scores=False):
+    """
+    Search the interpreter's text index (see TextIndex.search). Feed the
+    returned IDs to query_batch for their properties.
+    """
+    index = get_text_index(interp)
+    if index is None:
+        raise ValueError("No text index: load with text_index={table: [columns]} first")
+    return index.search(table, query, limit, columns, match, with_scores)
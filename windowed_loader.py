@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Time-windowed loading and eviction.
+
+Most reasoning targets recent records, so instead of all history a table
+can be loaded through a window on one of its timestamp columns:
+
+    WINDOWS = {"meetings": ("date", 90), "action_items": ("created_at", 90)}
+
+refresh_window(interp, WINDOWS) loads the rows inside the window; called
+again (e.g. every hour, see query_service.py --window), it removes the
+atoms of records that fell out of the window and loads rows that entered
+it, so the space stays bounded as the archive grows. After the first load
+only rows at or after the newest timestamp already loaded are fetched
+(unless the window grew). Membership is decided by the timestamp seen at
+load time; later edits to a loaded row, and rows inserted with a timestamp
+older than the newest one loaded, are not picked up. The window column
+must be a date or timestamp column.
+
+Records outside the window stay reachable through SQL:
+query_by_id_or_sql / query_batch_or_sql fall back to selecting just the
+requested columns (returned as Python values, not atoms), from the local
+row store when one is set (connect.set_row_store).
+
+Usage:
+    python windowed_loader.py --window meetings:date:90 --window action_items:created_at:90
+"""
+
+import argparse
+from datetime import date, datetime, timedelta, timezone
+
+from connect import (
+    column_types,
+    cursor,
+    fetch_after,
+    get_columns,
+    get_row_store,
+    get_space_state,
+    print_space_stats,
+    query_batch,
+    query_by_id,
+    record_row,
+    remove_record,
+    row_to_atoms,
+    table_space,
+)
+from aggregates import refresh_aggregate_atoms
+from export_metta import load_metta_text
+
+WINDOW_COLUMN_TYPES = ("date", "timestamp with time zone", "timestamp without time zone")
+
+
+def parse_window(spec):
+    """Parse "table:column:days" into (table, (column, days))."""
+    try:
+        table, column, days = spec.split(":")
+        return table, (column, int(days))
+    except ValueError:
+        raise ValueError(f"Invalid window '{spec}', expected table:column:days") from None
+
+
+def _as_utc(value):
+    # date / naive timestamp columns are taken as UTC
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day, tzinfo=timezone.utc)
+    return None
+
+
+def _check_window_column(table, column):
+    types = {c[0]: c[1] for c in get_columns(table)}
+    if column not in types:
+        raise ValueError(f"Window column {table}.{column} does not exist")
+    if types[column] not in WINDOW_COLUMN_TYPES:
+        raise ValueError(f"Window column {table}.{column} is {types[column]}, "
+                         f"expected one of {WINDOW_COLUMN_TYPES}")
+
+
+def _ids_param(table):
+    """Placeholder for a list of IDs in ANY(), cast to the id column's type (e.g. uuid[])."""
+    data_type = column_types(table).get("id")
+    if data_type is None or data_type in ("ARRAY", "USER-DEFINED"):
+        return "%s"
+    return f"%s::{data_type}[]"
+
+
+def _window_state(interp, table, column):
+    windows = get_space_state(interp).setdefault("windows", {})
+    window = windows.get(table)
+    if window is None or window["column"] != column:
+        _check_window_column(table, column)
+        window = windows[table] = {"column": column, "cutoff": None, "newest": None,
+                                   "loaded": {}}
+    return window
+
+
+def refresh_window(interp, windows, now=None, chunk_size=5000):
+    """
+    Bring windowed tables up to date: evict records older than the window,
+    load records that entered it. The first call does the initial load.
+
+    Args:
+        interp: MeTTa interpreter
+        windows: {table: (timestamp_column, days)}
+        now: Reference time (default: current UTC time)
+        chunk_size: IDs per keyset page when looking for new rows
+
+    Returns:
+        {table: {'added_rows', 'added_atoms', 'evicted_rows', 'evicted_atoms', 'rows'}}
+    """
+    state = get_space_state(interp)
+    now = now or datetime.now(timezone.utc)
+    summary = {}
+
+    for table, (column, days) in windows.items():
+        window = _window_state(interp, table, column)
+        loaded = window["loaded"]
+        cutoff = now - timedelta(days=days)
+
+        # Evict records that fell out of the window (or have no timestamp)
+        stale = []
+        for rid, ts in loaded.items():
+            ts = _as_utc(ts)
+            if ts is None or ts < cutoff:
+                stale.append(rid)
+        evicted_atoms = 0
+        if stale:
+            columns = [c[0] for c in get_columns(table) if c[0] != "id"]
+            for rid in stale:
+                evicted_atoms += remove_record(interp, table, rid, columns)
+                del loaded[rid]
+
+        # Load rows that entered it: page through the IDs of rows at or after
+        # the newest timestamp loaded so far (the whole window on the first
+        # load, or when it grew) and fetch full rows only for IDs not loaded yet
+        since = cutoff
+        newest = window["newest"]
+        if newest is not None and window["cutoff"] is not None and cutoff >= window["cutoff"]:
+            since = max(cutoff, newest)
+        token, space = table_space(interp, table)
+        added_rows = added_atoms = 0
+        after_id = None
+        while True:
+            page = fetch_after(table, after_id, chunk_size, columns=f"id, {column}",
+                               where=f"{column} >= %s", params=(since,))
+            if not page:
+                break
+            after_id = page[-1]["id"]
+            new_ids = [r["id"] for r in page if r["id"] not in loaded]
+            if new_ids:
+                cursor.execute(f"SELECT * FROM {table} WHERE id = ANY({_ids_param(table)})",
+                               (new_ids,))
+                cols = [c[0] for c in cursor.description or ()]
+                lines = []
+                for values in cursor.fetchall():
+                    row = dict(zip(cols, values))
+                    atoms = row_to_atoms(table, row, state["layout"], state)
+                    lines.extend(atoms)
+                    record_row(state, table, atoms)
+                    loaded[row["id"]] = row[column]
+                    ts = _as_utc(row[column])
+                    if ts is not None and (newest is None or ts > newest):
+                        newest = ts
+                load_metta_text(interp, "\n".join(lines), None if token == "&self" else space)
+                added_rows += len(new_ids)
+                added_atoms += len(lines)
+            if len(page) < chunk_size:
+                break
+
+        window["cutoff"] = cutoff
+        window["newest"] = newest
+        summary[table] = {
+            "added_rows": added_rows,
+            "added_atoms": added_atoms,
+            "evicted_rows": len(stale),
+            "evicted_atoms": evicted_atoms,
+            "rows": len(loaded),
+        }
+        print(f"Window {table} ({column} >= {cutoff:%Y-%m-%d}): +{added_rows} rows, "
+              f"-{len(stale)} rows, {len(loaded)} in window")
+    refresh_aggregate_atoms(interp)
+    return summary
+
+
+# -------------------------------------------------------------
+# SQL FALLBACK
+# -------------------------------------------------------------
+def _select_by_ids(table, record_ids, properties):
+    store = get_row_store()
+    if store is not None and store.has_table(table):
+        return {r["id"]: r for r in store.get_many(table, record_ids, properties)}
+    cols = ", ".join(["id"] + [p for p in (properties or []) if p != "id"])
+    cursor.execute(f"SELECT {cols} FROM {table} WHERE id = ANY({_ids_param(table)})",
+                   (list(record_ids),))
+    names = [c[0] for c in cursor.description or ()]
+    return {row[0]: dict(zip(names, row)) for row in cursor.fetchall()}
+
+
+def query_by_id_or_sql(interp, table, record_id, properties=None):
+    """
+    query_by_id, falling back to a projection of the requested columns in
+    SQL for records outside the loaded window.
+    """
+    result = query_by_id(interp, table, record_id, properties)
+    if result is not None:
+        return result
+    return _select_by_ids(table, [record_id], properties).get(record_id)
+
+
+def query_batch_or_sql(interp, table, record_ids, properties=None, batch_size=50):
+    """
+    query_batch, with one SQL projection query for every ID that was not
+    found in the space. Results keep the order of `record_ids`.
+    """
+    found = {r["id"]: r for r in query_batch(interp, table, record_ids, properties, batch_size)}
+    missing = [rid for rid in record_ids if rid not in found]
+    if missing:
+        found.update(_select_by_ids(table, missing, properties))
+    return [found[rid] for rid in record_ids if rid in found]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load time windows of tables into MeTTa")
+    parser.add_argument("--window", action="append", required=True,
+                        help="table:column:days, e.g. meetings:date:90 (repeatable)")
+    args = parser.parse_args()
+
+    from hyperon import MeTTa
+    interp = MeTTa()
+    refresh_window(interp, dict(parse_window(w) for w in args.window))
+    print_space_stats(interp)
+
+
+if __name__ == "__main__":
+    main()